@@ -1,39 +1,143 @@
 # analisador.py
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import Dict, List, Optional, Union
 from produto import Produto
-from config import PAGES_TO_SCRAPE  # For normalization
+from product_store import ProductStore, normalize_name
+from product_db import ProductDB
+from config import PAGES_TO_SCRAPE, RANKING_WEIGHTS  # For normalization
+from metrics import METRICS, timed
+
+
+class RankingEngine:
+    """Score ponderado calculado de uma vez sobre arrays NumPy (relevância, preço, avaliação)."""
+
+    def __init__(self, pesos: Optional[Dict[str, float]] = None):
+        self.pesos = dict(RANKING_WEIGHTS if pesos is None else pesos)
+
+    def score(self, relevancia: np.ndarray, preco: np.ndarray, avaliacao: np.ndarray,
+              max_relev: Optional[float] = None, min_price: Optional[float] = None,
+              max_price: Optional[float] = None) -> np.ndarray:
+        """Os extremos de normalização podem vir de fora (ex.: calculados sobre entradas duplicadas)."""
+        if relevancia.size == 0:
+            return np.empty(0)
+        max_relev = relevancia.max() if max_relev is None else max_relev
+        if max_relev <= 0:
+            max_relev = 1
+        min_price = preco.min() if min_price is None else min_price
+        max_price = preco.max() if max_price is None else max_price
+        price_range = max_price - min_price if max_price > min_price else 1
+
+        return (self.pesos['relevancia'] * relevancia / max_relev) + \
+               (self.pesos['preco'] * (1 - (preco - min_price) / price_range)) + \
+               (self.pesos['avaliacao'] * avaliacao / 5.0)
+
+    @staticmethod
+    def order(scores: np.ndarray, top_n: Optional[int] = None) -> np.ndarray:
+        """Índices em ordem decrescente de score; empates mantêm a ordem original.
+
+        Com `top_n` menor que o total, usa argpartition e ordena só os k escolhidos.
+        """
+        n = scores.size
+        if top_n is None or top_n >= n:
+            return np.argsort(-scores, kind='stable')
+        if top_n <= 0:
+            return np.empty(0, dtype=np.intp)
+        kth = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+        above = np.flatnonzero(scores > kth)
+        # no limite, os empates ficam com os de menor índice (igual à ordenação estável)
+        ties = np.flatnonzero(scores == kth)[:top_n - above.size]
+        idx = np.concatenate([above, ties])
+        return idx[np.lexsort((idx, -scores[idx]))]
+
 
 class AnalisadorProdutos:
-    def __init__(self, produtos: List[Produto]):
+    def __init__(self, produtos: Union[List[Produto], ProductStore], pesos: Optional[Dict[str, float]] = None):
+        # aceita também um ProductStore que continua sendo alimentado durante a coleta
         self.produtos = produtos
+        self.engine = RankingEngine(pesos)
+        self._cache_key = None
+        self._unique: List[Produto] = []
+        self._scores = np.empty(0)
+        self._order: Optional[np.ndarray] = None
 
-    def rankear_produtos(self) -> List[Produto]:
-        if not self.produtos:
-            return []
+    @classmethod
+    def do_banco(cls, db: ProductDB, run_id: Optional[str] = None,
+                 pesos: Optional[Dict[str, float]] = None) -> 'AnalisadorProdutos':
+        """Analisador sobre os produtos de uma execução gravada na base (a última, por padrão)."""
+        return cls(db.load_products(run_id), pesos)
 
-        df = pd.DataFrame([p.__dict__ for p in self.produtos])
-        df['nome_normalized'] = df['nome'].str.lower().str.strip()
+    def _fingerprint(self):
+        if isinstance(self.produtos, ProductStore):
+            return ('store', id(self.produtos), self.produtos.version)
+        # O(1): uma lista só é percebida como alterada se mudar de tamanho; quem editar
+        # produtos no lugar (preço, relevância, avaliação) chama `invalidar_cache()`
+        return ('list', id(self.produtos), len(self.produtos))
 
-        max_relev = df['relevancia'].max() if not df['relevancia'].empty else 1
-        min_price, max_price = df['preco'].min(), df['preco'].max()
-        price_range = max_price - min_price if max_price > min_price else 1
-        
-        df['score'] = (0.5 * df['relevancia'] / max_relev) + \
-                    (0.3 * (1 - (df['preco'] - min_price) / price_range)) + \
-                    (0.2 * df['avaliacao'] / 5.0)
-
-        score_map = df.set_index('nome_normalized')['score'].to_dict()
-        for p in self.produtos:
-            normalized_name = p.nome.lower().strip()
-            if normalized_name in score_map:
-                p.ranking = score_map[normalized_name]
-        
-        unique_products = {p.nome.lower().strip(): p for p in self.produtos}
-        return sorted(list(unique_products.values()), key=lambda p: p.ranking or 0, reverse=True)
+    def invalidar_cache(self):
+        """Descarta os scores em cache (necessário após editar no lugar os produtos de uma lista)."""
+        self._cache_key = None
+
+    def _compute(self):
+        key = self._fingerprint()
+        if key == self._cache_key:
+            METRICS.incr('rank_cache_hits')
+            return
+        if isinstance(self.produtos, ProductStore):
+            # nomes já são únicos no store
+            unique = self.produtos.to_list()
+        else:
+            # mesmo nome normalizado: vale o último (posição do primeiro)
+            unique = list({normalize_name(p.nome): p for p in self.produtos}.values())
+        n = len(unique)
+        relevancia = np.fromiter((p.relevancia for p in unique), dtype=np.float64, count=n)
+        preco = np.fromiter((p.preco for p in unique), dtype=np.float64, count=n)
+        avaliacao = np.fromiter((p.avaliacao for p in unique), dtype=np.float64, count=n)
+
+        has_duplicates = n != len(self.produtos)
+        if has_duplicates:
+            # os extremos (máx. relevância, faixa de preço) consideram todas as entradas, como antes
+            all_relev = np.fromiter((p.relevancia for p in self.produtos), dtype=np.float64)
+            all_price = np.fromiter((p.preco for p in self.produtos), dtype=np.float64)
+            scores = self.engine.score(relevancia, preco, avaliacao,
+                                       all_relev.max(), all_price.min(), all_price.max())
+        else:
+            scores = self.engine.score(relevancia, preco, avaliacao)
+
+        for p, score in zip(unique, scores.tolist()):
+            p.ranking = score
+        if has_duplicates:
+            by_name = {normalize_name(p.nome): p.ranking for p in unique}
+            for p in self.produtos:
+                p.ranking = by_name[normalize_name(p.nome)]
+
+        self._unique = unique
+        self._scores = scores
+        self._order = None
+        self._cache_key = key
+
+    @timed('rank')
+    def rankear_produtos(self, top_n: Optional[int] = None) -> List[Produto]:
+        """Produtos únicos em ordem decrescente de score (só os `top_n` primeiros, se informado).
+
+        Os scores ficam em cache até o ProductStore mudar, a lista mudar de tamanho ou
+        `invalidar_cache()` ser chamado.
+        """
+        if not self.produtos:
+            return []
+        self._compute()
+        if top_n is not None and top_n < len(self._unique):
+            order = self.engine.order(self._scores, top_n)
+        else:
+            if self._order is None:
+                self._order = self.engine.order(self._scores)
+            order = self._order
+        unique = self._unique
+        return [unique[i] for i in order.tolist()]
 
+    @timed('export.csv')
     def salvar_ranking_em_csv(self, nome_arquivo: str, top_n: int = 5):
-        ranked_products = self.rankear_produtos()[:top_n]
+        ranked_products = self.rankear_produtos(top_n=top_n)
         if not ranked_products:
             print("No products to save.")
             return
@@ -63,7 +167,7 @@ class AnalisadorProdutos:
         print(f"Ranking salvo em {nome_arquivo}")
 
     def exibir_ranking(self, top_n: int = 5):
-        ranked_products = self.rankear_produtos()[:top_n]
+        ranked_products = self.rankear_produtos(top_n=top_n)
         if not ranked_products:
             print("No products found.")
             return
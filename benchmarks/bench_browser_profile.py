@@ -0,0 +1,58 @@
+# benchmarks/bench_browser_profile.py
+"""Compara os perfis de navegador 'default' e 'lean' no site local de fixtures.
+
+Mede, por navegação (cache do navegador desligado), o tempo até os cards ficarem
+visíveis e os bytes efetivamente enviados pelo servidor.
+
+    python -m benchmarks.bench_browser_profile --runs 10
+"""
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from config import SELECTORS
+from scraper import ZoomScraper
+from benchmarks.fixture_site import FixtureSite
+
+
+def bench_profile(site: FixtureSite, profile: str, runs: int):
+    scraper = ZoomScraper(headless=True, profile=profile)
+    try:
+        scraper.driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+        url = site.base_url + 'search.html'
+        times, sizes = [], []
+        for i in range(runs):
+            site.reset_bytes()
+            start = time.perf_counter()
+            scraper.driver.get(f"{url}?r={i}")
+            scraper.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, SELECTORS['PRODUCT_CARD_CONTAINER'])))
+            times.append(time.perf_counter() - start)
+            # dá tempo para downloads em segundo plano (vídeo, fontes) entrarem na conta
+            time.sleep(0.5)
+            sizes.append(site.reset_bytes())
+        return times, sizes
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--cards', type=int, default=40)
+    args = parser.parse_args()
+
+    with FixtureSite(n_cards=args.cards) as site:
+        print(f"{'perfil':<10}{'mediana (ms)':>14}{'p95 (ms)':>12}{'KB/página':>12}")
+        for profile in ('default', 'lean'):
+            times, sizes = bench_profile(site, profile, args.runs)
+            ordered = sorted(times)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f"{profile:<10}{statistics.median(times) * 1000:>14.1f}{p95 * 1000:>12.1f}"
+                  f"{statistics.mean(sizes) / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_ranking.py
+"""Tempo do ranking (AnalisadorProdutos) de 10 mil a 1 milhão de produtos sintéticos.
+
+    python -m benchmarks.bench_ranking --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from produto import Produto
+from analisador import AnalisadorProdutos
+
+
+def synthetic_products(n: int, seed: int = 1) -> List[Produto]:
+    rng = random.Random(seed)
+    return [
+        Produto(
+            nome=f"Notebook Sintético {i}",
+            preco=round(rng.uniform(900, 15000), 2),
+            relevancia=rng.randint(1, 12),
+            avaliacao=rng.choice([0.0, 3.5, 4.0, 4.3, 4.5, 4.8]),
+        )
+        for i in range(n)
+    ]
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--top', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'n':>10}{'completo (s)':>14}{'em cache (s)':>14}{f'top {args.top} (s)':>14}{'top em cache (s)':>18}")
+    for n in args.sizes:
+        produtos = synthetic_products(n)
+        full = _timed(lambda: AnalisadorProdutos(produtos).rankear_produtos())
+        analisador = AnalisadorProdutos(produtos)
+        analisador.rankear_produtos()
+        cached = _timed(lambda: analisador.rankear_produtos())
+        top = _timed(lambda: AnalisadorProdutos(produtos).rankear_produtos(top_n=args.top))
+        top_cached = _timed(lambda: analisador.rankear_produtos(top_n=args.top))
+        print(f"{n:>10}{full:>14.3f}{cached:>14.3f}{top:>14.3f}{top_cached:>18.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# benchmarks/bench_suite.py
+"""Benchmarks offline de parsing, merge e ranking, com comparação contra um baseline.
+
+Usa as páginas salvas em benchmarks/fixtures/ e páginas sintéticas (fixture_site) em
+tamanhos crescentes; nada acessa a rede. Para cada caso registra a mediana do tempo,
+a vazão (itens/s) e o pico de memória alocada (tracemalloc, numa execução à parte).
+
+    python -m benchmarks.bench_suite                                # roda e compara com baseline.json
+    python -m benchmarks.bench_suite --fail-on-regression           # sai com 1 se algum caso piorar
+    python -m benchmarks.bench_suite --save benchmarks/baseline.json
+    python -m benchmarks.bench_suite --quick --only parse
+
+O baseline vale para a máquina em que foi gravado: em outra máquina (ou depois de mudar o
+código medido), grave um novo com --save antes de comparar.
+"""
+import os
+import sys
+import json
+import platform
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from config import BASE_URL, SPEC_SELECTORS
+from collectors import ProductCollectors
+from parsers import make_soup
+from product_store import ProductStore
+from analisador import AnalisadorProdutos
+from benchmarks.fixture_site import search_page_html, product_page_html
+from benchmarks.bench_ranking import synthetic_products
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+SIZES = {
+    'search_cards': [100, 1000, 5000],
+    'spec_rows': [30, 300, 3000],
+    'merge_products': [10_000, 100_000],
+    'rank_products': [10_000, 100_000],
+}
+QUICK_SIZES = {
+    'search_cards': [100, 1000],
+    'spec_rows': [30, 300],
+    'merge_products': [10_000],
+    'rank_products': [10_000],
+}
+
+
+class Case:
+    """Um caso de benchmark: `setup()` prepara a entrada (fora da medição) e `run(entrada)` é medido."""
+
+    def __init__(self, name: str, size: int, unit: str, setup: Callable[[], object], run: Callable[[object], object]):
+        self.name = name
+        self.size = size
+        self.unit = unit
+        self.setup = setup
+        self.run = run
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+def _saved_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _spec_container(collectors: ProductCollectors, html: str):
+    soup = make_soup(html, collectors.backend)
+    for sel in SPEC_SELECTORS:
+        container = soup.select_one(sel)
+        if container is not None:
+            return container
+    raise ValueError("fixture has no spec container")
+
+
+def _with_duplicates(n: int):
+    # metade repetida: o merge precisa achar e atualizar os já vistos
+    unique = synthetic_products(n // 2)
+    return unique + synthetic_products(n - n // 2)
+
+
+def build_cases(sizes: Dict[str, List[int]]) -> List[Case]:
+    collectors = ProductCollectors(BASE_URL)
+    cases = []
+
+    saved_search = _saved_fixture('search_notebook.html')
+    n_saved_cards = len(collectors.parse_products_from_page(saved_search, 'bench'))
+    cases.append(Case('parse.search.saved', n_saved_cards, 'cards',
+                      lambda: saved_search, lambda html: collectors.parse_products_from_page(html, 'bench')))
+    for n in sizes['search_cards']:
+        cases.append(Case('parse.search.synthetic', n, 'cards',
+                          lambda n=n: search_page_html(n, seed=n),
+                          lambda html: collectors.parse_products_from_page(html, 'bench')))
+
+    saved_product = _saved_fixture('product_notebook.html')
+    n_saved_rows = sum(len(g) for g in collectors.get_product_details(saved_product).values())
+    cases.append(Case('parse.product.saved', n_saved_rows, 'rows',
+                      lambda: saved_product, collectors.get_product_details))
+    for n in sizes['spec_rows']:
+        cases.append(Case('parse.product.synthetic', n, 'rows',
+                          lambda n=n: product_page_html(n_rows=n, seed=n), collectors.get_product_details))
+    for n in sizes['spec_rows']:
+        cases.append(Case('extract.container', n, 'rows',
+                          lambda n=n: _spec_container(collectors, product_page_html(n_rows=n, filler=0, seed=n)),
+                          collectors._extract_from_container))
+
+    for n in sizes['merge_products']:
+        cases.append(Case('merge', n, 'products',
+                          lambda n=n: _with_duplicates(n), lambda products: ProductStore().merge(products)))
+    for n in sizes['rank_products']:
+        cases.append(Case('rank', n, 'products',
+                          lambda n=n: synthetic_products(n),
+                          lambda products: AnalisadorProdutos(products).rankear_produtos()))
+    return cases
+
+
+def measure(case: Case, repeat: int) -> Dict:
+    payload = case.setup()
+    case.run(payload)  # aquecimento (imports preguiçosos, caches de seletores)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(payload)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case.run(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    return {
+        'name': case.name,
+        'size': case.size,
+        'unit': case.unit,
+        'seconds': seconds,
+        'min_seconds': min(times),
+        'throughput': case.size / seconds if seconds else 0.0,
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_suite(sizes: Dict[str, List[int]], repeat: int, only: Optional[List[str]] = None) -> Dict:
+    results = {}
+    for case in build_cases(sizes):
+        if only and not any(case.name.startswith(prefix) for prefix in only):
+            continue
+        results[case.key] = measure(case, repeat)
+        r = results[case.key]
+        print(f"{case.key:<34}{r['seconds'] * 1000:>12.2f}{r['throughput']:>14,.0f} {case.unit + '/s':<12}"
+              f"{r['peak_kib']:>12,.0f}", flush=True)
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Imprime a razão atual/baseline (melhor tempo e pico de memória) por caso.
+
+    Retorna as chaves que pioraram além de `threshold`.
+    """
+    regressions = []
+    print(f"\n{'caso':<34}{'tempo x base':>14}{'memória x base':>16}")
+    for key, r in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            print(f"{key:<34}{'(novo)':>14}")
+            continue
+        # o melhor tempo é menos sensível a ruído do sistema que a mediana
+        time_ratio = r['min_seconds'] / base['min_seconds'] if base['min_seconds'] else float('inf')
+        mem_ratio = r['peak_kib'] / base['peak_kib'] if base['peak_kib'] else 1.0
+        flag = ''
+        if time_ratio > 1 + threshold or mem_ratio > 1 + threshold:
+            flag = '  <-- regressão'
+            regressions.append(key)
+        print(f"{key:<34}{time_ratio:>14.2f}{mem_ratio:>16.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="execuções medidas por caso (vale a mediana)")
+    parser.add_argument('--quick', action='store_true', help="só os tamanhos menores")
+    parser.add_argument('--only', nargs='+', help="prefixos dos casos a rodar (ex.: parse merge)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="JSON de referência para comparar")
+    parser.add_argument('--save', help="grava os resultados neste JSON (ex.: para atualizar o baseline)")
+    # a variação entre execuções na mesma máquina passa de 25% em alguns casos (merge, extract)
+    parser.add_argument('--threshold', type=float, default=1.0,
+                        help="piora relativa tolerada antes de marcar regressão (1.0 = 2x o baseline)")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="sair com código 1 quando algum caso passar do limite")
+    args = parser.parse_args()
+
+    print(f"{'caso':<34}{'mediana (ms)':>12}{'vazão':>14} {'':<12}{'pico (KiB)':>12}")
+    current = run_suite(QUICK_SIZES if args.quick else SIZES, args.repeat, args.only)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.save}")
+
+    if args.baseline and os.path.exists(args.baseline) and os.path.abspath(args.baseline) != os.path.abspath(args.save or ''):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} caso(s) acima do limite de {args.threshold:.0%}.")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/check_http_fetch.py
+"""Verifica o caminho HTTP de detalhes (http_fetch.py) contra um servidor local, sem rede.
+
+O servidor responde com a ficha técnica salva (200), uma página sem container de specs,
+um 404, um 429 e uma página em latin-1 declarada como utf-8. Só o primeiro produto deve
+ser aceito; os outros voltam para o navegador, sem derrubar o lote.
+
+    python -m benchmarks.check_http_fetch
+"""
+import os
+import sys
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from produto import Produto
+from collectors import ProductCollectors
+from http_fetch import HttpDetailFetcher
+from rate_limiter import AdaptiveRateLimiter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+NO_SPEC_HTML = ('<!DOCTYPE html><html><body><main><h1>Notebook sem ficha</h1>'
+                '<p>Especificações carregadas depois via JavaScript.</p></main></body></html>')
+
+
+def _routes():
+    with open(os.path.join(FIXTURES_DIR, 'product_notebook.html'), encoding='utf-8') as f:
+        spec_page = f.read()
+    return {
+        '/notebook/com-ficha': (200, spec_page),
+        '/notebook/sem-ficha': (200, NO_SPEC_HTML),
+        '/notebook/removido': (404, 'Not Found'),
+        '/notebook/limitado': (429, 'Too Many Requests'),
+        # bytes latin-1 com charset utf-8 no cabeçalho: response.text() falha ao decodificar
+        '/notebook/charset-errado': (200, spec_page.encode('latin-1', errors='replace')),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    routes = {}
+
+    def do_GET(self):
+        status, body = self.routes.get(self.path, (404, 'Not Found'))
+        data = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_check() -> list:
+    """Retorna a lista de falhas (vazia quando tudo confere)."""
+    _Handler.routes = _routes()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        products = {path: Produto(nome=path.rsplit('/', 1)[-1], preco=1.0, link=base + path) for path in _Handler.routes}
+        # limitador rápido: o 429 não deve deixar a verificação lenta
+        limiter = AdaptiveRateLimiter(rate=50, max_rate=100, burst=10, cooldown=0.1)
+        fetcher = HttpDetailFetcher(ProductCollectors(base), concurrency=4, timeout=5, rate_limiter=limiter)
+        remaining = fetcher.fetch(list(products.values()))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    failures = []
+    accepted = products['/notebook/com-ficha']
+    if accepted in remaining or 'Processador' not in accepted.detalhes:
+        failures.append(f"page with specs was not accepted: {accepted.detalhes}")
+    if list(fetcher.pages) != [accepted.link]:
+        failures.append(f"unexpected accepted pages: {list(fetcher.pages)}")
+    for path in ('/notebook/sem-ficha', '/notebook/removido', '/notebook/limitado', '/notebook/charset-errado'):
+        if products[path] not in remaining:
+            failures.append(f"{path} should fall back to the browser")
+        if products[path].detalhes:
+            failures.append(f"{path} should not get details: {products[path].detalhes}")
+    if limiter.metrics()['throttled_429'] != 1:
+        failures.append(f"429 not reported to the rate limiter: {limiter.metrics()}")
+    return failures
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    if not HttpDetailFetcher.available():
+        print("aiohttp is not installed; the HTTP path is disabled. Nothing to check.")
+        return
+    failures = run_check()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: HTTP detail fetch accepts pages with specs and falls back on no-spec, 404, 429 and bad charset.")
+
+
+if __name__ == '__main__':
+    main()
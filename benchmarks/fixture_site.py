@@ -0,0 +1,120 @@
+# benchmarks/fixture_site.py
+"""Site local de fixtures para benchmarks: serve páginas geradas e conta os bytes enviados."""
+import os
+import random
+import shutil
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+def search_page_html(n_cards: int, seed: int = 1, assets: bool = True) -> str:
+    """Página de busca sintética no formato dos cards do Zoom (config.SELECTORS)."""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(n_cards):
+        price = f"{rng.randint(1, 9)}.{rng.randint(100, 999)},{rng.randint(10, 99)}"
+        score = f"{rng.randint(30, 50) / 10:.1f}".replace('.', ',')
+        rating = (f'<span data-testid="product-card::rating">{score} ({rng.randint(1, 900)})</span>'
+                  if i % 4 else '')
+        img = f'<img src="/img/p{i % 20}.png" alt="">' if assets else ''
+        cards.append(
+            f'<div data-testid="product-card" class="card"><a href="/notebook/notebook-{seed}-{i}">'
+            f'{img}<h2>Notebook Marca{i % 7} Modelo {seed}-{i} Intel Core i{3 + 2 * (i % 3)} 8GB SSD 256GB</h2></a>'
+            f'<p data-testid="product-card::price">R$ {price}</p>{rating}</div>'
+        )
+    head = ''
+    tail = ''
+    if assets:
+        head = ('<style>@font-face{font-family:F;src:url(/fonts/f.woff2)}body{font-family:F}</style>'
+                '<script async src="/gtm.js?id=GTM-X"></script>')
+        tail = '<video src="/media/promo.mp4" preload="auto" muted></video>'
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>notebook</title>{head}</head>'
+            f'<body><header><nav><ul><li>Início</li><li>Notebooks</li></ul></nav></header>'
+            f'<main>{"".join(cards)}</main>{tail}<footer>Zoom</footer></body></html>')
+
+
+def product_page_html(n_rows: int = 30, filler: int = 300, seed: int = 1) -> str:
+    """Página de produto sintética com ficha técnica em tabela, dl e li, cercada de blocos aninhados."""
+    rng = random.Random(seed)
+    rows = ''.join(f'<tr><th>Atributo {i}</th><td>Valor {rng.randint(1, 999)}</td></tr>' for i in range(n_rows))
+    dl = ''.join(f'<dt>Conexão {i}</dt><dd>USB {i}</dd>' for i in range(n_rows // 3))
+    lis = ''.join(f'<li>Item {i}: {rng.randint(1, 99)} un</li>' for i in range(n_rows // 3))
+    blocks = ''.join(f'<div class="b"><div><section><p>Texto de apoio {i}</p><span>{i}</span></section></div></div>'
+                     for i in range(filler))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>produto</title></head><body>'
+            f'<main>{blocks}<div><section id="technicalSpecifications"><h2>Ficha técnica</h2>'
+            f'<table aria-label="Geral">{rows}</table><dl>{dl}</dl><ul>{lis}</ul></section></div>{blocks}</main>'
+            f'</body></html>')
+
+
+class _CountingHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, site=None, **kwargs):
+        self._site = site
+        super().__init__(*args, **kwargs)
+
+    def copyfile(self, source, outputfile):
+        data = source.read()
+        self._site.add_bytes(len(data))
+        outputfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    """Servidor HTTP local (thread) com páginas de busca/produto e assets pesados (imagens, fonte, vídeo)."""
+
+    def __init__(self, n_cards: int = 40, asset_kb: int = 60):
+        self.n_cards = n_cards
+        self.asset_kb = asset_kb
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._root = None
+        self._server = None
+
+    def add_bytes(self, n: int):
+        with self._lock:
+            self.bytes_sent += n
+
+    def reset_bytes(self) -> int:
+        with self._lock:
+            sent, self.bytes_sent = self.bytes_sent, 0
+            return sent
+
+    def _write(self, rel: str, data):
+        path = os.path.join(self._root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def _build(self):
+        blob = os.urandom(self.asset_kb * 1024)
+        self._write('search.html', search_page_html(self.n_cards))
+        self._write('product.html', product_page_html())
+        for i in range(20):
+            self._write(f'img/p{i}.png', blob)
+        self._write('fonts/f.woff2', blob)
+        self._write('media/promo.mp4', blob * 4)
+        self._write('gtm.js', 'window.dataLayer = [];')
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        self._root = tempfile.mkdtemp(prefix='zoom-fixture-')
+        self._build()
+        handler = partial(_CountingHandler, directory=self._root, site=self)
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self._root, ignore_errors=True)
@@ -0,0 +1,178 @@
+# cache.py
+"""Cache em disco, comprimido e endereçado por conteúdo, das páginas buscadas."""
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from config import CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS, CACHE_INDEX_SAVE_EVERY
+
+
+def search_key(query: str, filtro: str, page: int) -> str:
+    return f"search|{query.strip().lower()}|{filtro}|{page}"
+
+
+def product_key(link: str) -> str:
+    return f"product|{link}"
+
+
+class HtmlCache:
+    """Guarda cada payload (HTML, fragmentos ou registros) uma única vez, pelo sha256 do conteúdo.
+
+    Um índice JSON mapeia chaves lógicas (busca por query/filtro/página, produto por link)
+    para o hash do blob. Entradas mais velhas que `max_age_days` são descartadas e, se o
+    total passar de `max_bytes`, as menos usadas recentemente saem primeiro.
+
+    O índice é salvo a cada `save_every` alterações (inclusive acessos, que alimentam o LRU
+    entre execuções) e em `close()`; um crash perde no máximo essas últimas alterações.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, root: str, max_bytes: int = CACHE_MAX_BYTES, max_age_days: float = CACHE_MAX_AGE_DAYS,
+                 save_every: int = CACHE_INDEX_SAVE_EVERY):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.save_every = max(1, save_every)
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        os.makedirs(os.path.join(root, 'blobs'), exist_ok=True)
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    # ---------- Índice ----------
+    def _index_path(self) -> str:
+        return os.path.join(self.root, self.INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cache index unreadable ({e}). Starting with an empty cache.")
+            return {}
+
+    def _save_index(self):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp, self._index_path())
+        self._unsaved = 0
+
+    def _changed(self):
+        # chamado com o lock: salva o índice só a cada `save_every` alterações
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self._save_index()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'blobs', digest[:2], digest + '.json.gz')
+
+    # ---------- API ----------
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry:
+                return None
+            if self.max_age and time.time() - entry['stored_at'] > self.max_age:
+                self._drop(key)
+                self._changed()
+                return None
+            try:
+                with gzip.open(self._blob_path(entry['hash']), 'rt', encoding='utf-8') as f:
+                    payload = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Cache blob for '{key}' unreadable ({e}). Dropping it.")
+                self._drop(key)
+                self._changed()
+                return None
+            entry['accessed_at'] = time.time()
+            self._changed()
+            return payload
+
+    def put(self, key: str, payload: Any):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            now = time.time()
+            self._index[key] = {
+                'hash': digest,
+                'size': os.path.getsize(path),
+                'stored_at': now,
+                'accessed_at': now,
+            }
+            self._evict()
+            self._changed()
+
+    def flush(self):
+        """Salva o índice se houver alterações pendentes."""
+        with self._lock:
+            if self._unsaved:
+                self._save_index()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def keys(self, prefix: str = '') -> list:
+        with self._lock:
+            return [k for k in self._index if k.startswith(prefix)]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(e['size'] for e in self._unique_blobs().values())
+
+    # ---------- Eviction ----------
+    def _unique_blobs(self) -> Dict[str, Dict[str, Any]]:
+        blobs: Dict[str, Dict[str, Any]] = {}
+        for entry in self._index.values():
+            blobs.setdefault(entry['hash'], entry)
+        return blobs
+
+    def _drop(self, key: str):
+        entry = self._index.pop(key, None)
+        if not entry:
+            return
+        if any(e['hash'] == entry['hash'] for e in self._index.values()):
+            return
+        try:
+            os.remove(self._blob_path(entry['hash']))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        if self.max_age:
+            cutoff = time.time() - self.max_age
+            for key in [k for k, e in self._index.items() if e['stored_at'] < cutoff]:
+                self._drop(key)
+        if not self.max_bytes:
+            return
+        total = sum(e['size'] for e in self._unique_blobs().values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]['accessed_at']):
+            if total <= self.max_bytes:
+                break
+            entry = self._index[key]
+            shared = sum(1 for e in self._index.values() if e['hash'] == entry['hash']) > 1
+            self._drop(key)
+            if not shared:
+                total -= entry['size']
@@ -1,88 +1,336 @@
 # collectors.py
+import re
 import logging
-from typing import List, Dict, Union
-from bs4 import BeautifulSoup
+from collections import Counter
+from typing import List, Dict, Optional, Union
+from bs4 import NavigableString, Tag
 
 from produto import Produto
-from config import SELECTORS, SPEC_SELECTORS
+from config import (SELECTORS, SPEC_SELECTORS, PARSER_BACKEND, PARSE_ONLY_CARDS, USE_STRUCTURED_DATA,
+                    PRODUCT_CARD_STRAINER)
+from parsers import make_soup, resolve_backend, card_strainer
+import structured_data
+from metrics import METRICS, timed
+
+# palavras que marcam um bloco de especificações no fallback de get_product_details
+SPEC_KEYWORDS = ('ficha técnica', 'especificações', 'técnic')
+SPEC_BLOCK_TAGS = ('section', 'div', 'article')
+# filhos que marcam itens distintos dentro de um valor (tags inline como span/b não separam)
+VALUE_ITEM_TAGS = ('li', 'div', 'p')
+VALUE_LIST_TAGS = ('ul', 'ol')
+# `detalhes` de uma página que carregou mas não tem ficha técnica
+NO_SPECS_ERROR = "Nenhum dado técnico encontrado."
+
+# contagem barata de cards no HTML cru, para validar o JSON embutido contra o DOM
+_CARD_MARKER_RE = re.compile(
+    '|'.join(rf'{attr}=["\']{re.escape(value)}["\']' for attr, value in PRODUCT_CARD_STRAINER[1].items())
+)
 
 
 class ProductCollectors:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, backend: str = PARSER_BACKEND, parse_only_cards: bool = PARSE_ONLY_CARDS,
+                 use_structured_data: bool = USE_STRUCTURED_DATA):
         self.base_url = base_url
+        self.backend = resolve_backend(backend)
+        self.parse_only_cards = parse_only_cards
+        self.use_structured_data = use_structured_data
+        # caminho usado na última página ('json-ld', 'hydration', 'dom', 'records') e totais por caminho
+        self.last_path: Optional[str] = None
+        self.path_counts: Counter = Counter()
+
+    def _record_path(self, path: str, kind: str):
+        self.last_path = path
+        self.path_counts[f"{kind}:{path}"] += 1
+        METRICS.incr(f"parse_path.{kind}.{path}")
+
+    @timed('parse.search')
+    def parse_products_from_page(self, page_source: Union[str, List[str], List[Dict[str, Optional[str]]]],
+                                 filtro: str) -> List[Produto]:
+        """Extrai os produtos de uma página de busca.
+
+        Aceita o HTML completo da página, a lista de fragmentos HTML dos cards ou a
+        lista de registros compactos (nome/preco/avaliacao/link) devolvida pelo navegador.
+        """
+        if isinstance(page_source, list):
+            if page_source and isinstance(page_source[0], dict):
+                return self.parse_products_from_records(page_source, filtro)
+            page_source = "".join(page_source)
+
+        if self.use_structured_data:
+            products = self._products_from_structured_data(page_source, filtro)
+            if products is not None:
+                return products
 
-    def parse_products_from_page(self, page_source: str, filtro: str) -> List[Produto]:
         products: List[Produto] = []
-        soup = BeautifulSoup(page_source, 'html.parser')
+        strainer = card_strainer() if self.parse_only_cards else None
+        soup = make_soup(page_source, self.backend, parse_only=strainer)
 
         cards = soup.select(SELECTORS['PRODUCT_CARD_CONTAINER'])
         for card in cards:
             try:
-                name_elem = card.select_one("h2, h3, [data-testid='product-card::name']")
-                price_elem = card.select_one("[data-testid='product-card::price'], span[data-testid='product-card::price'], .product-card__price, [class*='price']")
-                link_elem = card.select_one("a[href*='/notebook/']") or card.select_one('a')
+                name_elem = card.select_one(SELECTORS['CARD_NAME'])
+                price_elem = card.select_one(SELECTORS['CARD_PRICE'])
+                link_elem = card.select_one(SELECTORS['CARD_LINK']) or card.select_one('a')
 
                 if not (name_elem and price_elem and link_elem):
                     continue
 
-                name = name_elem.get_text(strip=True)
+                # avaliação pode não existir
+                rating_elem = card.select_one(SELECTORS['CARD_RATING'])
+                product = self._build_product(
+                    name_elem.get_text(strip=True),
+                    price_elem.get_text(),
+                    link_elem.get('href'),
+                    rating_elem.get_text() if rating_elem else None,
+                    filtro
+                )
+                if product:
+                    products.append(product)
+            except Exception as e:
+                logging.warning(f"Erro ao extrair dados de um produto: {e}")
+                continue
+
+        self._record_path('dom', 'search')
+        logging.info(f"Página analisada (dom). {len(products)} produtos extraídos para o filtro '{filtro}'.")
+        return products
 
-                price_text = price_elem.get_text().replace('R$', '').replace('.', '').replace(',', '.').strip()
-                price = float(price_text)
-                if not 0 < price < 100000:
-                    logging.warning(f"Invalid price {price} for {name}, skipping.")
-                    continue
+    def _products_from_structured_data(self, page_source: str, filtro: str) -> Optional[List[Produto]]:
+        """Produtos a partir do JSON embutido, ou None para seguir pelo DOM.
 
-                link = link_elem.get('href')
-                if link and link.startswith('/'):
-                    link = self.base_url.rstrip('/') + link
+        O JSON só é aceito se cobrir ao menos tantos produtos quantos cards existem no HTML
+        (listas embutidas às vezes trazem só os primeiros itens).
+        """
+        path, records = structured_data.extract_search_products(page_source)
+        if not records:
+            return None
+        n_cards = len(_CARD_MARKER_RE.findall(page_source))
+        if len(records) < n_cards:
+            logging.info(f"Embedded {path} has {len(records)} products but the page has {n_cards} cards. Using the DOM.")
+            return None
 
-                # avaliação pode não existir
-                rating = 0.0
-                rating_elem = card.select_one("[data-testid='product-card::rating'], .rating, [aria-label*='avalia']")
-                if rating_elem:
-                    try:
-                        rating = float(rating_elem.get_text().split('(')[0].strip().replace(',', '.'))
-                    except Exception:
-                        pass
-
-                products.append(Produto(
-                    nome=name,
-                    preco=price,
-                    avaliacao=rating,
-                    link=link,
-                    filtros_pesquisados=[filtro]
-                ))
+        products: List[Produto] = []
+        for name, price, link, rating in records:
+            product = self._new_product(name, price, link, rating, filtro)
+            if product:
+                products.append(product)
+
+        self._record_path(path, 'search')
+        logging.info(f"Página analisada ({path}). {len(products)} produtos extraídos para o filtro '{filtro}'.")
+        return products
+
+    def parse_products_from_records(self, records: List[Dict[str, Optional[str]]], filtro: str) -> List[Produto]:
+        """Monta produtos a partir dos registros compactos extraídos no navegador (extraction.py)."""
+        products: List[Produto] = []
+        for record in records:
+            try:
+                if not (record.get('nome') and record.get('preco') and record.get('link')):
+                    continue
+                product = self._build_product(
+                    record['nome'], record['preco'], record['link'], record.get('avaliacao'), filtro
+                )
+                if product:
+                    products.append(product)
             except Exception as e:
                 logging.warning(f"Erro ao extrair dados de um produto: {e}")
                 continue
 
-        logging.info(f"Página analisada. {len(products)} produtos extraídos para o filtro '{filtro}'.")
+        self._record_path('records', 'search')
+        logging.info(f"Página analisada (records). {len(products)} produtos extraídos para o filtro '{filtro}'.")
         return products
 
+    def _build_product(self, name: str, price_raw: str, link: Optional[str], rating_raw: Optional[str],
+                       filtro: str) -> Optional[Produto]:
+        price_text = price_raw.replace('R$', '').replace('.', '').replace(',', '.').strip()
+        price = float(price_text)
+
+        rating = 0.0
+        if rating_raw:
+            try:
+                rating = float(rating_raw.split('(')[0].strip().replace(',', '.'))
+            except Exception:
+                pass
+
+        return self._new_product(name, price, link, rating, filtro)
+
+    def _new_product(self, name: str, price: float, link: Optional[str], rating: float,
+                     filtro: str) -> Optional[Produto]:
+        if not 0 < price < 100000:
+            logging.warning(f"Invalid price {price} for {name}, skipping.")
+            return None
+
+        if link and link.startswith('/'):
+            link = self.base_url.rstrip('/') + link
+
+        return Produto(
+            nome=name,
+            preco=price,
+            avaliacao=rating,
+            link=link,
+            filtros_pesquisados=[filtro]
+        )
+
+    @timed('parse.product')
     def get_product_details(self, page_source: str) -> Dict[str, Dict[str, str]]:
-        """Extrai ficha técnica de diferentes formatos (tabela, lista, dl/dt)."""
-        soup = BeautifulSoup(page_source, 'html.parser')
+        """Extrai ficha técnica de diferentes formatos (tabela, lista, dl/dt).
+
+        `page_source` pode ser a página inteira ou só o fragmento do container de specs.
+        """
+        # 0) JSON-LD embutido (Product.additionalProperty)
+        details = self._details_from_structured_data(page_source)
+        if details:
+            return details
+
+        soup = make_soup(page_source, self.backend)
 
         # 1) tentar containers conhecidos
+        details = self._details_from_known_containers(soup)
+        if details:
+            self._record_path('dom', 'product')
+            return details
+
+        # 2) fallback: procurar qualquer bloco com palavras de especificação
+        block = self._find_spec_block(soup)
+        if block is not None:
+            details = self._extract_from_container(block)
+            if details:
+                self._record_path('dom-fallback', 'product')
+                return details
+
+        self._record_path('none', 'product')
+        logging.warning("Nenhum container de especificações encontrado. Retornando fallback.")
+        return {"Detalhes": {"Erro": NO_SPECS_ERROR}}
+
+    @timed('parse.product')
+    def get_known_container_details(self, page_source: str) -> Optional[Dict[str, Dict[str, str]]]:
+        """Como get_product_details, mas só aceita os containers de SPEC_SELECTORS (sem fallback).
+
+        Retorna None quando nenhum container conhecido rende especificações.
+        """
+        details = self._details_from_structured_data(page_source)
+        if details:
+            return details
+        details = self._details_from_known_containers(make_soup(page_source, self.backend))
+        if details:
+            self._record_path('dom', 'product')
+        return details
+
+    def _details_from_structured_data(self, page_source: str) -> Optional[Dict[str, Dict[str, str]]]:
+        if not self.use_structured_data:
+            return None
+        details = structured_data.extract_product_specs(page_source)
+        if details:
+            self._record_path('json-ld', 'product')
+            logging.info("Ficha técnica extraída do JSON-LD.")
+        return details
+
+    def _details_from_known_containers(self, soup) -> Optional[Dict[str, Dict[str, str]]]:
         for sel in SPEC_SELECTORS:
             container = soup.select_one(sel)
             if container:
                 details = self._extract_from_container(container)
                 if details:
                     return details
+        return None
 
-        # 2) fallback: procurar qualquer bloco com palavras de especificação
-        candidates = soup.select("section, div, article")
-        for cand in candidates:
-            text = (cand.get_text(" ", strip=True) or '').lower()
-            if any(k in text for k in ['ficha técnica', 'especificações', 'técnic']):
-                details = self._extract_from_container(cand)
-                if details:
-                    return details
+    def _find_spec_block(self, soup):
+        """Escolhe, numa única passada pelo DOM, o bloco (section/div/article) de especificações.
 
-        logging.warning("Nenhum container de especificações encontrado. Retornando fallback.")
-        return {"Detalhes": {"Erro": "Nenhum dado técnico encontrado."}}
+        Cada texto com palavra-chave e cada linha de especificação (tr/dt-dd/li, com as mesmas
+        regras de _extract_from_container) é contado uma vez e somado aos ancestrais numa
+        varredura em ordem reversa. Entre os blocos com palavra-chave, vence o que tem mais
+        linhas; no empate, o menor (menos elementos), e depois o primeiro no documento.
+        """
+        elements = soup.find_all(True)
+        if not elements:
+            return None
+        position = {id(el): i for i, el in enumerate(elements)}
+        rows = [0] * len(elements)
+        keyword = [False] * len(elements)
+        size = [1] * len(elements)
+
+        for text in soup.strings:
+            parent = text.parent
+            if parent is not None and id(parent) in position:
+                lowered = text.lower()
+                if any(k in lowered for k in SPEC_KEYWORDS):
+                    keyword[position[id(parent)]] = True
+
+        for tbl in soup.find_all('table'):
+            rows[position[id(tbl)]] += sum(1 for _ in self._table_rows(tbl))
+        for dl in soup.find_all('dl'):
+            rows[position[id(dl)]] += sum(1 for _ in self._dl_rows(dl))
+        for li in soup.find_all('li'):
+            if self._li_row(li):
+                rows[position[id(li)]] += 1
+
+        best, best_key = None, None
+        for i in range(len(elements) - 1, -1, -1):
+            el = elements[i]
+            parent = position.get(id(el.parent))
+            if parent is not None:
+                rows[parent] += rows[i]
+                keyword[parent] = keyword[parent] or keyword[i]
+                size[parent] += size[i]
+            if el.name in SPEC_BLOCK_TAGS and keyword[i] and rows[i]:
+                key = (-rows[i], size[i], i)
+                if best_key is None or key < best_key:
+                    best, best_key = el, key
+        return best
+
+    @staticmethod
+    def _table_rows(tbl):
+        for tr in tbl.select('tr'):
+            cols = tr.find_all(['th', 'td'])
+            if len(cols) >= 2:
+                key = cols[0].get_text(strip=True)
+                val = ProductCollectors._value_text(cols[1])
+                if key and val:
+                    yield key, val
+
+    @staticmethod
+    def _dl_rows(dl):
+        for dt, dd in zip(dl.find_all('dt'), dl.find_all('dd')):
+            key = dt.get_text(strip=True)
+            val = ProductCollectors._value_text(dd)
+            if key and val:
+                yield key, val
+
+    @staticmethod
+    def _value_text(cell) -> str:
+        """Texto do valor de uma especificação.
+
+        Valores com vários itens (separados por <br>, em <li> ou em blocos <div>/<p>) viram
+        "HDMI, USB-C" em vez do texto colado "HDMIUSB-C". Tags inline não separam:
+        <span>16</span><span>GB</span> continua "16GB".
+        """
+        children = [c for c in cell.children if not (isinstance(c, NavigableString) and not c.strip())]
+        if any(isinstance(c, Tag) and c.name == 'br' for c in children):
+            items, current = [], []
+            for c in children:
+                if isinstance(c, Tag) and c.name == 'br':
+                    items.append(current)
+                    current = []
+                else:
+                    current.append(c)
+            items.append(current)
+            texts = [''.join(c.get_text(strip=True) if isinstance(c, Tag) else c.strip() for c in item)
+                     for item in items]
+        elif len(children) >= 2 and all(isinstance(c, Tag) and c.name in VALUE_ITEM_TAGS for c in children):
+            texts = [c.get_text(" ", strip=True) for c in children]
+        elif len(children) == 1 and isinstance(children[0], Tag) and children[0].name in VALUE_LIST_TAGS:
+            texts = [li.get_text(" ", strip=True) for li in children[0].find_all('li', recursive=False)]
+        else:
+            return cell.get_text(strip=True)
+        return ', '.join(t for t in texts if t)
+
+    @staticmethod
+    def _li_row(li) -> Optional[tuple]:
+        txt = li.get_text(" ", strip=True)
+        if ':' in txt and len(txt) < 120:
+            key, val = [p.strip() for p in txt.split(':', 1)]
+            if key and val:
+                return key, val
+        return None
 
     def _extract_from_container(self, container) -> Dict[str, Dict[str, str]]:
         details: Dict[str, Dict[str, str]] = {}
@@ -90,37 +338,21 @@ class ProductCollectors:
         # A) tabelas <table>
         for tbl in container.select('table'):
             title = tbl.get('aria-label') or tbl.get('summary') or 'Ficha técnica'
-            group = {}
-            for tr in tbl.select('tr'):
-                cols = tr.find_all(['th', 'td'])
-                if len(cols) >= 2:
-                    key = cols[0].get_text(strip=True)
-                    val = cols[1].get_text(strip=True)
-                    if key and val:
-                        group[key] = val
+            group = dict(self._table_rows(tbl))
             if group:
                 details[title] = group
 
         # B) listas de definição <dl>
         for dl in container.select('dl'):
             title = dl.get('aria-label') or 'Especificações'
-            group = {}
-            dts = dl.find_all('dt')
-            dds = dl.find_all('dd')
-            for dt, dd in zip(dts, dds):
-                key = dt.get_text(strip=True)
-                val = dd.get_text(strip=True)
-                if key and val:
-                    group[key] = val
+            group = dict(self._dl_rows(dl))
             if group:
                 details[title] = group
 
         # C) itens <li> com padrão "chave: valor"
         for li in container.select('li'):
-            txt = li.get_text(" ", strip=True)
-            if ':' in txt and len(txt) < 120:
-                key, val = [p.strip() for p in txt.split(':', 1)]
-                if key and val:
-                    details.setdefault('Especificações', {})[key] = val
+            row = self._li_row(li)
+            if row:
+                details.setdefault('Especificações', {})[row[0]] = row[1]
 
         return details
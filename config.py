@@ -2,6 +2,11 @@
 SELECTORS = {
     'SEARCH_INPUT': "input#searchInput",
     'PRODUCT_CARD_CONTAINER': "div[data-testid='product-card']",
+    # campos dentro de cada card
+    'CARD_NAME': "h2, h3, [data-testid='product-card::name']",
+    'CARD_PRICE': "[data-testid='product-card::price'], span[data-testid='product-card::price'], .product-card__price, [class*='price']",
+    'CARD_LINK': "a[href*='/notebook/']",
+    'CARD_RATING': "[data-testid='product-card::rating'], .rating, [aria-label*='avalia']",
     # seletor do <select> de ordenação
     'SORT_SELECT': "select[data-testid='select-order-by'], select#orderBy",
     # paginação (usamos .format para substituir {page_num})
@@ -10,6 +15,23 @@ SELECTORS = {
     'SPEC_TAB_XPATH': "//button[contains(translate(normalize-space(.), 'FICHA TÉCNICA', 'ficha técnica'), 'ficha técnica')]"
 }
 
+# (tag, atributos) equivalentes a SELECTORS['PRODUCT_CARD_CONTAINER'], usados para
+# analisar somente as subárvores dos cards (modo "parse_only")
+PRODUCT_CARD_STRAINER = ('div', {'data-testid': 'product-card'})
+
+# backend de parsing do HTML: 'lxml' (mais rápido) ou 'html.parser' (fallback, sem dependências)
+PARSER_BACKEND = 'lxml'
+# analisar apenas os cards de produto nas páginas de busca. Desligado por padrão: o
+# tempo é dominado pelos select_one por card (soupsieve), não pela montagem da árvore,
+# e o strainer não foi mais rápido (lxml, fixture salva: 27,0 ms com vs. 22,0 ms sem;
+# 1000 cards: 0,325 s vs. 0,291 s; html.parser: 0,50 s vs. 0,47 s)
+PARSE_ONLY_CARDS = False
+# tentar antes os dados estruturados embutidos (JSON-LD / JSON de hidratação)
+USE_STRUCTURED_DATA = True
+# no modo 'fragments', trazer também o JSON de hidratação (__NEXT_DATA__ etc.) das páginas de
+# busca sem JSON-LD. Desligado: no site (Next.js) ele tem vários MB por página
+FETCH_HYDRATION_DATA = False
+
 # lista de seletores alternativos para o container de especificações
 SPEC_SELECTORS = [
     "section#technicalSpecifications",
@@ -21,7 +43,100 @@ SPEC_SELECTORS = [
     "section.product-specifications",
 ]
 
+# o que trazer do navegador: 'page_source' (HTML completo), 'fragments' (só o HTML dos
+# cards / do container de specs) ou 'json' (registros compactos dos cards)
+EXTRACTION_MODE = 'fragments'
+
 BASE_URL = "https://www.zoom.com.br/"
+# URLs diretas de busca/ordenação/paginação (coleta paralela por filtro)
+SEARCH_PATH = "search"
+SEARCH_QUERY_PARAM = "q"
+SORT_PARAM = "sortBy"
+PAGE_PARAM = "page"
+
+# nomes de filtro -> valores comuns da opção de ordenação (o primeiro é usado na URL)
+FILTER_SORT_VALUES = {
+    'Mais Relevantes': ['relevance', 'relevancia', 'relevance_desc'],
+    'Melhor Avaliados': ['rating_desc', 'best_rating', 'avaliacao_desc'],
+    'Menor Preço': ['price_asc', 'menor_preco', 'priceasc']
+}
 PAGES_TO_SCRAPE = 3
+# pesos do score de ranking (analisador.py)
+RANKING_WEIGHTS = {'relevancia': 0.5, 'preco': 0.3, 'avaliacao': 0.2}
+# só entram no resultado produtos cujo nome contém este termo (None = todos)
+REQUIRED_NAME_TERM = "notebook"
 WAIT_TIMEOUT = 45  # um pouco maior para páginas lentas
 RETRY_ATTEMPTS = 3
+
+# esperas por condição (readiness.py)
+READINESS_MIN_POLL = 0.05  # intervalo inicial de polling (s), cresce 1.5x a cada tentativa
+READINESS_MAX_POLL = 1.0
+CHANGE_WAIT_TIMEOUT = 15   # espera a lista de cards mudar após ordenar/paginar
+SPEC_WAIT_TIMEOUT = 10     # espera o container de specs/rede ociosa na página de produto
+NETWORK_IDLE_QUIET = 0.5   # segundos sem novos recursos para considerar a rede ociosa
+JITTER_RANGE = (0.2, 0.8)  # atraso aleatório residual (ajustar com as estatísticas de espera)
+
+# número de navegadores em paralelo para abrir as páginas de detalhes (1 = sequencial)
+DETAIL_WORKERS = 4
+# número de navegadores em paralelo na coleta por (filtro, página)
+SEARCH_WORKERS = 4
+# cada sessão do pool é reciclada (novo Chrome) depois de tantas páginas
+SESSION_RECYCLE_AFTER = 200
+
+# cache em disco das páginas buscadas (cache.py) e modo replay
+CACHE_DIR = ".cache/pages"
+CACHE_MAX_BYTES = 500 * 1024 * 1024
+CACHE_MAX_AGE_DAYS = 7
+CACHE_INDEX_SAVE_EVERY = 50  # alterações no índice (gravações e acessos) entre salvamentos; sempre no close
+
+# caminho HTTP (aiohttp) para as páginas de produto, com fallback para o Selenium
+USE_HTTP_DETAILS = True
+HTTP_CONCURRENCY = 8   # requisições simultâneas (e conexões keep-alive) no máximo
+HTTP_TIMEOUT = 20
+HTTP_HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'),
+    'Accept-Language': 'pt-BR,pt;q=0.9',
+}
+
+# limitador de taxa compartilhado (rate_limiter.py): token bucket com ajuste AIMD
+RATE_LIMIT_INITIAL = 1.0    # requisições/s no início
+RATE_LIMIT_MIN = 0.1
+RATE_LIMIT_MAX = 4.0
+RATE_LIMIT_BURST = 2        # tokens acumuláveis
+RATE_LIMIT_INCREASE = 0.05  # aumento aditivo por resposta OK
+RATE_LIMIT_DECREASE = 0.5   # fator multiplicativo por 429
+RATE_LIMIT_COOLDOWN = 6.0   # pausa da frota no primeiro 429 (cresce 1.5x nos consecutivos)
+
+# perfil do navegador: 'default' ou 'lean' (carregamento eager, sem imagens/mídia/fontes/terceiros)
+BROWSER_PROFILE = 'default'
+# padrões de URL bloqueados no perfil 'lean' (Network.setBlockedURLs; '*' é curinga)
+LEAN_BLOCKED_URLS = [
+    # imagens, mídia e fontes
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # anúncios, analytics e rastreadores
+    '*googletagmanager.com*', '*/gtm.js*', '*google-analytics.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*adservice.google.*', '*facebook.net*', '*connect.facebook.*',
+    '*hotjar.com*', '*criteo.*', '*taboola.com*', '*outbrain.com*', '*clarity.ms*',
+    '*tiktok.com*', '*bing.com/bat*', '*nr-data.net*', '*newrelic.com*',
+]
+
+# saída incremental (writers.py): 'jsonl', 'parquet' (requer pyarrow) ou 'none'
+OUTPUT_FORMAT = 'jsonl'
+OUTPUT_DIR = "output"
+PARQUET_BATCH_ROWS = 500  # linhas por arquivo-parte Parquet
+
+# métricas do run (metrics.py): relatório JSON, textfile do Prometheus e cProfile opcional
+METRICS_DIR = "output/metrics"
+PROFILE_STAGES = ['parse.search', 'parse.product']  # etapas perfiladas com --profile
+
+# base local de produtos (product_db.py): ficha técnica com validade e histórico de preços
+PRODUCT_DB_PATH = "output/produtos.db"
+SPEC_TTL_DAYS = 30  # fichas mais novas que isso não são buscadas de novo
+
+# fila de tarefas da coleta (scheduler.py)
+JOBS_DB_PATH = "output/jobs.db"
+JOB_MAX_ATTEMPTS = 3
+SCHEDULER_PROGRESS_INTERVAL = 30  # segundos entre logs de progresso
@@ -0,0 +1,99 @@
+# extraction.py
+"""Scripts executados no navegador para trazer só o necessário em vez do page_source inteiro."""
+from typing import Dict, List, Optional
+
+from config import SELECTORS, SPEC_SELECTORS
+
+# outerHTML de cada card de produto
+_CARD_FRAGMENTS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (el) { return el.outerHTML; });
+"""
+
+# registros compactos por card; o nome imita get_text(strip=True) do BeautifulSoup
+# (cada nó de texto aparado e concatenado sem separador)
+_CARD_RECORDS_JS = """
+var cardSel = arguments[0], nameSel = arguments[1], priceSel = arguments[2],
+    linkSel = arguments[3], ratingSel = arguments[4];
+function strippedText(el) {
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT), parts = [], node;
+    while ((node = walker.nextNode())) {
+        var t = node.nodeValue.trim();
+        if (t) { parts.push(t); }
+    }
+    return parts.join('');
+}
+return Array.from(document.querySelectorAll(cardSel)).map(function (card) {
+    var name = card.querySelector(nameSel),
+        price = card.querySelector(priceSel),
+        link = card.querySelector(linkSel) || card.querySelector('a'),
+        rating = card.querySelector(ratingSel);
+    return {
+        nome: name ? strippedText(name) : null,
+        preco: price ? price.textContent : null,
+        link: link ? link.getAttribute('href') : null,
+        avaliacao: rating ? rating.textContent : null
+    };
+});
+"""
+
+# outerHTML do primeiro container de specs encontrado, na ordem de SPEC_SELECTORS
+_SPEC_CONTAINER_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var el = document.querySelector(selectors[i]);
+    if (el) { return el.outerHTML; }
+}
+return null;
+"""
+
+# outerHTML dos blocos de dados estruturados, que ficam fora dos cards e do container de
+# specs e por isso não viriam junto com os fragmentos. Os blocos JSON-LD são pequenos; o JSON
+# de hidratação (arguments[1]) pode ter vários MB e só vem quando não há JSON-LD
+_STRUCTURED_SCRIPTS_JS = """
+function outer(selector) {
+    return Array.from(document.querySelectorAll(selector)).map(function (el) { return el.outerHTML; });
+}
+var scripts = outer(arguments[0]);
+if (!scripts.length && arguments[1]) { scripts = outer(arguments[1]); }
+return scripts;
+"""
+JSON_LD_SELECTOR = 'script[type="application/ld+json"]'
+HYDRATION_SELECTOR = 'script#__NEXT_DATA__, script#__NUXT_DATA__, script#__APOLLO_STATE__'
+
+
+def extract_structured_scripts(driver, hydration: bool = False) -> List[str]:
+    """Blocos JSON-LD; com `hydration`, o JSON de hidratação quando a página não tem JSON-LD."""
+    return driver.execute_script(_STRUCTURED_SCRIPTS_JS, JSON_LD_SELECTOR,
+                                 HYDRATION_SELECTOR if hydration else None) or []
+
+
+def extract_card_fragments(driver, structured_data: bool = False, hydration: bool = False) -> List[str]:
+    """outerHTML dos cards; com `structured_data`, precedidos dos scripts de dados estruturados."""
+    cards = driver.execute_script(_CARD_FRAGMENTS_JS, SELECTORS['PRODUCT_CARD_CONTAINER']) or []
+    if structured_data and cards:
+        return extract_structured_scripts(driver, hydration) + cards
+    return cards
+
+
+def extract_card_records(driver) -> List[Dict[str, Optional[str]]]:
+    return driver.execute_script(
+        _CARD_RECORDS_JS,
+        SELECTORS['PRODUCT_CARD_CONTAINER'],
+        SELECTORS['CARD_NAME'],
+        SELECTORS['CARD_PRICE'],
+        SELECTORS['CARD_LINK'],
+        SELECTORS['CARD_RATING'],
+    ) or []
+
+
+def extract_spec_container(driver, structured_data: bool = False) -> Optional[str]:
+    """outerHTML do container de specs; com `structured_data`, precedido dos blocos JSON-LD.
+
+    Retorna None quando não há nem container nem dados estruturados.
+    """
+    container = driver.execute_script(_SPEC_CONTAINER_JS, SPEC_SELECTORS)
+    # a ficha técnica só é lida do JSON-LD; o JSON de hidratação (grande) fica de fora
+    scripts = extract_structured_scripts(driver) if structured_data else []
+    if not container and not scripts:
+        return None
+    return ''.join(scripts) + (container or '')
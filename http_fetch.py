@@ -0,0 +1,92 @@
+# http_fetch.py
+"""Caminho HTTP leve (asyncio) para as páginas de produto, sem abrir o Chrome."""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from produto import Produto
+from collectors import ProductCollectors
+from rate_limiter import AdaptiveRateLimiter
+from config import HTTP_CONCURRENCY, HTTP_TIMEOUT, HTTP_HEADERS
+
+try:
+    import aiohttp
+except ImportError:  # dependência opcional: sem ela, só o caminho Selenium é usado
+    aiohttp = None
+
+
+class HttpDetailFetcher:
+    """Busca páginas de produto por HTTP com pool de conexões (keep-alive) e concorrência limitada.
+
+    Só aceita o resultado quando a página já traz um container de SPEC_SELECTORS; os
+    demais produtos são devolvidos para o caminho Selenium.
+    """
+
+    def __init__(self, collectors: ProductCollectors, concurrency: int = HTTP_CONCURRENCY,
+                 timeout: float = HTTP_TIMEOUT, headers: Optional[Dict[str, str]] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self.collectors = collectors
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.headers = headers if headers is not None else HTTP_HEADERS
+        # html das páginas aceitas, por link (para quem quiser guardar no cache)
+        self.pages: Dict[str, str] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return aiohttp is not None
+
+    def fetch(self, products: List[Produto]) -> List[Produto]:
+        """Preenche `detalhes` dos produtos que deram certo; retorna os que precisam do Selenium."""
+        if not products:
+            return []
+        return asyncio.run(self.fetch_async(products))
+
+    async def fetch_async(self, products: List[Produto]) -> List[Produto]:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers) as session:
+            results = await asyncio.gather(*(self._fetch_one(session, semaphore, p) for p in products))
+        return [p for p, ok in zip(products, results) if not ok]
+
+    async def _fetch_one(self, session, semaphore: asyncio.Semaphore, product: Produto) -> bool:
+        if not product.link:
+            return False
+        async with semaphore:
+            await self.rate_limiter.acquire_async()
+            try:
+                async with session.get(product.link) as response:
+                    if response.status == 429:
+                        self.rate_limiter.on_429()
+                    elif response.status == 200:
+                        self.rate_limiter.on_success()
+                    if response.status != 200:
+                        logging.info(f"HTTP {response.status} for {product.nome}. Falling back to the browser.")
+                        return False
+                    html = await response.text()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.info(f"HTTP fetch failed for {product.nome} ({e}). Falling back to the browser.")
+                return False
+            except Exception as e:
+                # ex.: UnicodeDecodeError/LookupError com charset declarado errado; a falha fica
+                # restrita a este produto (o gather propagaria e derrubaria o lote todo)
+                logging.warning(f"Could not read the HTTP response for {product.nome} ({type(e).__name__}: {e}). Falling back to the browser.")
+                return False
+
+        # parsing é CPU; roda fora do event loop para não travar as outras conexões
+        try:
+            details = await asyncio.get_running_loop().run_in_executor(
+                None, self.collectors.get_known_container_details, html
+            )
+        except Exception as e:
+            logging.warning(f"Could not parse the HTTP response for {product.nome} ({type(e).__name__}: {e}). Falling back to the browser.")
+            return False
+        if not details:
+            logging.info(f"No spec container in the HTTP response for {product.nome}. Falling back to the browser.")
+            return False
+        product.detalhes = details
+        self.pages[product.link] = html
+        logging.info(f"Details fetched over HTTP for {product.nome}.")
+        return True
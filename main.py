@@ -1,8 +1,17 @@
 # main.py
+import os
+import argparse
 import logging
 from scraper import ZoomScraper
 from analisador import AnalisadorProdutos
-from config import PAGES_TO_SCRAPE
+from cache import HtmlCache
+from replay import ReplayScraper
+from writers import open_writer
+from metrics import METRICS
+from product_db import ProductDB
+from scheduler import JobQueue, CrawlScheduler
+from config import (PAGES_TO_SCRAPE, CACHE_DIR, OUTPUT_FORMAT, OUTPUT_DIR, METRICS_DIR, PROFILE_STAGES,
+                    PRODUCT_DB_PATH, SPEC_TTL_DAYS, JOBS_DB_PATH, SEARCH_WORKERS)
 
 if __name__ == "__main__":
     logging.basicConfig(
@@ -10,19 +19,72 @@ if __name__ == "__main__":
         format="%(asctime)s - %(levelname)s - %(message)s"
     )
 
-    # Deixe False para ver o navegador trabalhando. Mude para True em servidores/CI.
-    scraper = ZoomScraper(headless=False)
+    parser = argparse.ArgumentParser(description="Coleta e ranking de notebooks no Zoom.")
+    parser.add_argument("--replay", action="store_true",
+                        help="usar só as páginas do cache, sem abrir o navegador")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="diretório do cache de páginas")
+    parser.add_argument("--output-format", default=OUTPUT_FORMAT, choices=["jsonl", "parquet", "none"],
+                        help="formato da saída incremental (produtos e fichas técnicas)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="diretório da saída incremental")
+    parser.add_argument("--db", default=PRODUCT_DB_PATH,
+                        help="base SQLite de produtos (histórico de preços e fichas técnicas); 'none' desativa")
+    parser.add_argument("--spec-ttl-days", type=float, default=SPEC_TTL_DAYS,
+                        help="idade máxima, em dias, de uma ficha técnica reaproveitada da base")
+    parser.add_argument("--resume", action="store_true",
+                        help="continuar a coleta interrompida a partir da fila de tarefas em --jobs-db")
+    parser.add_argument("--jobs-db", default=JOBS_DB_PATH, help="fila de tarefas da coleta (SQLite)")
+    parser.add_argument("--workers", type=int, default=SEARCH_WORKERS, help="navegadores em paralelo")
+    parser.add_argument("--sequential", action="store_true",
+                        help="coleta num só navegador, pela caixa de busca e pelo select de ordenação "
+                             "(sem fila de tarefas nem URLs diretas)")
+    parser.add_argument("--metrics-dir", default=METRICS_DIR,
+                        help="diretório do relatório de métricas (JSON e textfile do Prometheus)")
+    parser.add_argument("--profile", action="store_true",
+                        help="rodar as etapas de parsing sob cProfile e gravar os perfis em --metrics-dir")
+    args = parser.parse_args()
+
+    if args.profile:
+        METRICS.enable_profiling(PROFILE_STAGES)
+
+    # no replay o cache é só lido: sem validade, para não apagar snapshots antigos
+    cache = HtmlCache(args.cache_dir, max_age_days=0) if args.replay else HtmlCache(args.cache_dir)
+    writer = open_writer(args.output_format, args.output_dir)
+    product_db = None
+    # no replay a base só é lida (fichas reaproveitadas não estão no cache), e só se já existir
+    if args.db != 'none' and (not args.replay or os.path.exists(args.db)):
+        product_db = ProductDB(args.db, args.spec_ttl_days, run_id=writer.run_id if writer is not None else None)
+    queue = scheduler = None
+    if args.replay:
+        scraper = ReplayScraper(cache, writer=writer, product_db=product_db)
+    else:
+        # Deixe False para ver o navegador trabalhando. Mude para True em servidores/CI.
+        # Com a fila de tarefas só os workers do pool navegam: o Chrome principal não é aberto
+        scraper = ZoomScraper(headless=False, cache=cache, writer=writer, product_db=product_db,
+                              start_driver=args.sequential)
+        if not args.sequential:
+            queue = JobQueue(args.jobs_db)
+            if not args.resume:
+                queue.reset()
+            else:
+                retried = queue.retry_failed()
+                if retried:
+                    logging.info(f"Resuming: {retried} failed jobs will be retried.")
+            scheduler = CrawlScheduler(scraper, queue, workers=args.workers)
 
     termo_de_busca = "notebook"
     filtros = ["Mais Relevantes", "Melhor Avaliados", "Menor Preço"]
 
     try:
-        # 1) Busca no Zoom e coleta das 3 primeiras páginas para cada filtro
-        produtos = scraper.search_and_collect(
-            query=termo_de_busca,
-            filters=filtros,
-            pages_to_scrape=PAGES_TO_SCRAPE
-        )
+        if scheduler is not None:
+            # 1-3) Buscas e fichas técnicas dos 5 melhores como tarefas na fila (retomável com --resume)
+            produtos = scheduler.run([termo_de_busca], filtros, PAGES_TO_SCRAPE, top_n=5)[termo_de_busca]
+        else:
+            # 1) Busca (no navegador ou no cache) das 3 primeiras páginas para cada filtro
+            produtos = scraper.search_and_collect(
+                query=termo_de_busca,
+                filters=filtros,
+                pages_to_scrape=PAGES_TO_SCRAPE
+            )
 
         if not produtos:
             logging.warning("No products were found after scraping.")
@@ -35,8 +97,9 @@ if __name__ == "__main__":
                 # Mostrar um sumário no terminal
                 analisador.exibir_ranking(top_n=5)
 
-                # 3) Abrir cada um dos top 5 e capturar a Ficha Técnica
-                scraper.fetch_details_for_top(ranked_products, top_n=5)
+                # 3) Abrir cada um dos top 5 e capturar a Ficha Técnica (o scheduler já fez isso)
+                if scheduler is None:
+                    scraper.fetch_details_for_top(ranked_products, top_n=5)
 
                 # 4) Salvar CSV final com detalhes dos 5 melhores
                 analisador.salvar_ranking_em_csv("melhores_notebooks.csv", top_n=5)
@@ -48,4 +111,17 @@ if __name__ == "__main__":
             exc_info=True
         )
     finally:
+        if queue is not None:
+            queue.close()
         scraper.close()
+        cache.close()
+        if writer is not None:
+            writer.close()
+        if product_db is not None:
+            product_db.close()
+        run_id = writer.run_id if writer is not None else METRICS.run_id
+        METRICS.export_json(os.path.join(args.metrics_dir, f"run-{run_id}.json"))
+        METRICS.export_prometheus(os.path.join(args.metrics_dir, "zoom_scraper.prom"))
+        if args.profile:
+            METRICS.dump_profiles(os.path.join(args.metrics_dir, "profiles"))
+        logging.info(f"Run metrics written to {args.metrics_dir}.")
@@ -0,0 +1,200 @@
+# metrics.py
+"""Instrumentação leve do pipeline: tempos por etapa, contadores, gauges e cProfile opcional.
+
+Uso:
+    from metrics import METRICS
+    with METRICS.timer('parse.search'):
+        ...
+    METRICS.incr('pages_collected')
+
+No fim do run, `export_json` grava o relatório e `export_prometheus` um textfile para o
+node_exporter (textfile collector).
+"""
+import os
+import io
+import logging
+import json
+import time
+import pstats
+import cProfile
+import threading
+import functools
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+
+class Metrics:
+    def __init__(self, namespace: str = 'zoom'):
+        self.namespace = namespace
+        self.started_at = time.time()
+        self.run_id = datetime.fromtimestamp(self.started_at, timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._max: Dict[str, float] = defaultdict(float)
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._profiled_stages: set = set()
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        # um profiler ativo por vez no processo (no Python >= 3.12 o cProfile usa
+        # sys.monitoring e um segundo enable() concorrente levanta ValueError)
+        self._profile_lock = threading.Lock()
+
+    # ---------- Coleta ----------
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            self._calls[stage] += 1
+            self._seconds[stage] += seconds
+            if seconds > self._max[stage]:
+                self._max[stage] = seconds
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Mede o bloco; se a etapa estiver em `enable_profiling`, roda também sob cProfile."""
+        profiler = self._start_profile(stage)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+            if profiler is not None:
+                profiler.disable()
+
+    # ---------- cProfile ----------
+    def enable_profiling(self, stages: Iterable[str]):
+        self._profiled_stages.update(stages)
+
+    def _start_profile(self, stage: str) -> Optional['_ProfileHandle']:
+        """Perfila a chamada se nenhuma outra estiver sendo perfilada; senão ela só é cronometrada.
+
+        Com vários workers o perfil é, portanto, uma amostra das chamadas da etapa; chamadas
+        aninhadas (mesma thread) também ficam de fora.
+        """
+        if stage not in self._profiled_stages:
+            return None
+        if not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = self._profiles.get(stage)
+        if profiler is None:
+            profiler = self._profiles[stage] = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # outra ferramenta de profiling já está ativa (ex.: python -m cProfile)
+            self._profile_lock.release()
+            logging.debug(f"Could not profile stage '{stage}': {e}")
+            return None
+        return _ProfileHandle(profiler, self._profile_lock)
+
+    def dump_profiles(self, directory: str, top: int = 30) -> Dict[str, str]:
+        """Grava <etapa>.prof (pstats) e <etapa>.txt (top funções por tempo acumulado)."""
+        os.makedirs(directory, exist_ok=True)
+        written = {}
+        with self._profile_lock:
+            profiles = dict(self._profiles)
+        for stage, profiler in profiles.items():
+            try:
+                stats = pstats.Stats(profiler)
+            except TypeError:
+                # perfil vazio: a etapa nunca chegou a ser perfilada
+                continue
+            base = os.path.join(directory, stage.replace('/', '_'))
+            stats.dump_stats(base + '.prof')
+            buffer = io.StringIO()
+            pstats.Stats(base + '.prof', stream=buffer).sort_stats('cumulative').print_stats(top)
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                f.write(buffer.getvalue())
+            written[stage] = base + '.prof'
+        return written
+
+    # ---------- Exportação ----------
+    def report(self) -> Dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    'calls': self._calls[stage],
+                    'seconds': self._seconds[stage],
+                    'mean': self._seconds[stage] / self._calls[stage] if self._calls[stage] else 0.0,
+                    'max': self._max[stage],
+                }
+                for stage in sorted(self._calls)
+            }
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+                'wall_seconds': time.time() - self.started_at,
+                'stages': stages,
+                'counters': dict(sorted(self._counters.items())),
+                'gauges': dict(sorted(self._gauges.items())),
+            }
+
+    def export_json(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def export_prometheus(self, path: str):
+        """Formato texto do Prometheus; escrita atômica, como o textfile collector exige."""
+        report = self.report()
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_seconds_total Time spent per pipeline stage.",
+            f"# TYPE {ns}_stage_seconds_total counter",
+        ]
+        lines += [f'{ns}_stage_seconds_total{{stage="{_escape(s)}"}} {v["seconds"]:.6f}' for s, v in report['stages'].items()]
+        lines += [f"# HELP {ns}_stage_calls_total Calls per pipeline stage.", f"# TYPE {ns}_stage_calls_total counter"]
+        lines += [f'{ns}_stage_calls_total{{stage="{_escape(s)}"}} {v["calls"]}' for s, v in report['stages'].items()]
+        lines += [f"# HELP {ns}_stage_max_seconds Slowest call per pipeline stage.", f"# TYPE {ns}_stage_max_seconds gauge"]
+        lines += [f'{ns}_stage_max_seconds{{stage="{_escape(s)}"}} {v["max"]:.6f}' for s, v in report['stages'].items()]
+        lines += [f"# HELP {ns}_events_total Pipeline event counters.", f"# TYPE {ns}_events_total counter"]
+        lines += [f'{ns}_events_total{{name="{_escape(n)}"}} {v:g}' for n, v in report['counters'].items()]
+        lines += [f"# HELP {ns}_gauge Pipeline gauges.", f"# TYPE {ns}_gauge gauge"]
+        lines += [f'{ns}_gauge{{name="{_escape(n)}"}} {v:g}' for n, v in report['gauges'].items()]
+        lines += [f"# HELP {ns}_run_wall_seconds Wall time of the run.", f"# TYPE {ns}_run_wall_seconds gauge",
+                  f"{ns}_run_wall_seconds {report['wall_seconds']:.3f}"]
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp, path)
+
+
+class _ProfileHandle:
+    def __init__(self, profiler: cProfile.Profile, lock: threading.Lock):
+        self._profiler = profiler
+        self._lock = lock
+
+    def disable(self):
+        try:
+            self._profiler.disable()
+        finally:
+            self._lock.release()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# registro do processo, compartilhado por scraper, collectors e analisador
+METRICS = Metrics()
+
+
+def timed(stage: str):
+    """Decorator: mede cada chamada da função como `stage` no registro global."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with METRICS.timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+# parsers.py
+import logging
+from typing import Optional
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import PRODUCT_CARD_STRAINER
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# backend -> tree builder do BeautifulSoup
+BACKENDS = {
+    'lxml': 'lxml',
+    'html.parser': 'html.parser',
+}
+FALLBACK_BACKEND = 'html.parser'
+
+
+def resolve_backend(backend: str) -> str:
+    """Retorna um backend utilizável, caindo para 'html.parser' se o pedido não estiver disponível."""
+    if backend not in BACKENDS:
+        logging.warning(f"Unknown parser backend '{backend}'. Using '{FALLBACK_BACKEND}'.")
+        return FALLBACK_BACKEND
+    if backend == 'lxml' and not HAS_LXML:
+        logging.warning(f"lxml is not installed. Using '{FALLBACK_BACKEND}'.")
+        return FALLBACK_BACKEND
+    return backend
+
+
+def card_strainer() -> SoupStrainer:
+    """SoupStrainer que mantém apenas as subárvores dos cards de produto."""
+    name, attrs = PRODUCT_CARD_STRAINER
+    return SoupStrainer(name, attrs=attrs)
+
+
+def make_soup(html: str, backend: str = FALLBACK_BACKEND, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    return BeautifulSoup(html, BACKENDS[backend], parse_only=parse_only)
@@ -0,0 +1,143 @@
+# pool.py
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar, Any
+
+from config import SESSION_RECYCLE_AFTER
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class ScraperPool:
+    """Pool limitado de workers (ZoomScraper), cada um com seu próprio driver e WebDriverWait.
+
+    Os workers são criados sob demanda, até `size`. Se o driver de um worker morrer
+    durante uma tarefa, ele é descartado, substituído por um novo e a tarefa é
+    repetida (até `max_retries` vezes), sem derrubar o lote inteiro.
+
+    O pool pode viver entre várias chamadas (sessões "quentes"): workers ociosos passam
+    por um health check antes de serem reutilizados e são reciclados depois de
+    `recycle_after` tarefas, para não acumular memória do Chrome.
+    """
+
+    def __init__(self, size: int, factory: Callable[[], Any], max_retries: int = 1,
+                 recycle_after: int = SESSION_RECYCLE_AFTER):
+        self.size = max(1, size)
+        self.max_retries = max_retries
+        self.recycle_after = recycle_after
+        self._factory = factory
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._workers: List[Any] = []
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                create = self._idle.empty() and self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                break
+            worker = self._idle.get()
+            if worker.is_alive():
+                return worker
+            logging.warning("Idle worker failed its health check. Replacing it.")
+            self._discard(worker)
+        try:
+            worker = self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._workers.append(worker)
+            self._uses[id(worker)] = 0
+        return worker
+
+    def _release(self, worker):
+        with self._lock:
+            self._uses[id(worker)] = uses = self._uses.get(id(worker), 0) + 1
+        if self.recycle_after and uses >= self.recycle_after:
+            logging.info(f"Recycling worker after {uses} tasks.")
+            self._discard(worker)
+            return
+        self._idle.put(worker)
+
+    def _discard(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self._uses.pop(id(worker), None)
+            self._created -= 1
+        try:
+            worker.close()
+        except Exception:
+            pass
+
+    def _run_one(self, item, task: Callable[[Any, Any], Any], max_retries: int):
+        result = None
+        for attempt in range(max_retries + 1):
+            try:
+                worker = self._acquire()
+            except Exception as e:
+                logging.error(f"Could not start a pool worker: {e}")
+                return result
+            try:
+                result = task(worker, item)
+            except Exception:
+                # devolver (ou descartar) o worker antes de propagar; senão o pool trava no próximo _acquire
+                if worker.is_alive():
+                    self._release(worker)
+                else:
+                    self._discard(worker)
+                raise
+            if worker.is_alive():
+                self._release(worker)
+                return result
+            logging.warning(f"Worker driver crashed. Replacing it... (attempt {attempt+1}/{max_retries + 1})")
+            self._discard(worker)
+        return result
+
+    def run(self, task: Callable[[Any, T], R], item: T, max_retries: Optional[int] = None) -> Optional[R]:
+        """Executa uma tarefa num worker do pool (para quem distribui as tarefas por conta própria)."""
+        return self._run_one(item, task, self.max_retries if max_retries is None else max_retries)
+
+    def map(self, task: Callable[[Any, T], R], items: Iterable[T], concurrency: Optional[int] = None,
+            max_retries: Optional[int] = None) -> List[R]:
+        """Executa `task(worker, item)` para cada item; resultados na ordem dos itens.
+
+        `max_retries` substitui o do pool nesta chamada (0 = não repetir a tarefa quando o
+        driver morre, só trocar o worker).
+        """
+        items = list(items)
+        if not items:
+            return []
+        concurrency = self.size if concurrency is None else min(self.size, max(1, concurrency))
+        max_retries = self.max_retries if max_retries is None else max_retries
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+            futures = [executor.submit(self._run_one, item, task, max_retries) for item in items]
+            return [f.result() for f in futures]
+
+    def close(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._uses.clear()
+            self._created = 0
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for worker in workers:
+            try:
+                worker.close()
+            except Exception as e:
+                logging.warning(f"Error closing pool worker: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,188 @@
+# product_db.py
+"""Base local (SQLite) de produtos: ficha técnica com validade e histórico de preço/avaliação.
+
+Tabelas:
+  - products: uma linha por link canônico, com a última ficha técnica e quando ela foi obtida;
+  - observations: uma linha por produto visto numa página de busca (run, query, filtro, página).
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from produto import Produto
+from product_store import ProductStore, canonical_link
+from config import PRODUCT_DB_PATH, SPEC_TTL_DAYS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    link         TEXT PRIMARY KEY,
+    nome         TEXT NOT NULL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    detalhes     TEXT,
+    detalhes_at  REAL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id       TEXT NOT NULL,
+    observed_at  REAL NOT NULL,
+    link         TEXT NOT NULL,
+    nome         TEXT NOT NULL,
+    preco        REAL NOT NULL,
+    avaliacao    REAL NOT NULL,
+    query        TEXT,
+    filtro       TEXT,
+    pagina       INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_observations_link ON observations (link, observed_at);
+CREATE INDEX IF NOT EXISTS idx_observations_run ON observations (run_id, id);
+"""
+
+
+def _has_error(detalhes: Dict) -> bool:
+    return not detalhes or "Erro" in detalhes.get("Detalhes", {})
+
+
+class ProductDB:
+    """Produtos persistidos entre execuções, indexados pelo link canônico.
+
+    Seguro para uso pelos workers do pool (uma conexão, serializada por lock).
+    """
+
+    def __init__(self, path: str = PRODUCT_DB_PATH, spec_ttl_days: float = SPEC_TTL_DAYS,
+                 run_id: Optional[str] = None):
+        self.path = path
+        self.spec_ttl = spec_ttl_days * 86400
+        self.run_id = run_id or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '-' + uuid.uuid4().hex[:6]
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ---------- Escrita ----------
+    def record_observations(self, products: List[Produto], query: Optional[str] = None,
+                            filtro: Optional[str] = None, pagina: Optional[int] = None):
+        """Registra os produtos vistos numa página de busca e atualiza a tabela de produtos."""
+        now = time.time()
+        rows = [(canonical_link(p.link), p) for p in products if p.link]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO products (link, nome, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(link) DO UPDATE SET nome = excluded.nome, last_seen = excluded.last_seen",
+                [(link, p.nome, now, now) for link, p in rows]
+            )
+            self._conn.executemany(
+                "INSERT INTO observations (run_id, observed_at, link, nome, preco, avaliacao, query, filtro, pagina) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.run_id, now, link, p.nome, p.preco, p.avaliacao, query, filtro, pagina) for link, p in rows]
+            )
+
+    def save_details(self, produto: Produto):
+        """Guarda a ficha técnica; resultados de erro não são gravados (não devem parecer frescos)."""
+        if not produto.link or _has_error(produto.detalhes):
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO products (link, nome, first_seen, last_seen, detalhes, detalhes_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(link) DO UPDATE SET detalhes = excluded.detalhes, detalhes_at = excluded.detalhes_at",
+                (canonical_link(produto.link), produto.nome, now, now,
+                 json.dumps(produto.detalhes, ensure_ascii=False), now)
+            )
+
+    # ---------- Leitura ----------
+    def _details_row(self, link: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT detalhes, detalhes_at FROM products WHERE link = ?", (canonical_link(link),)
+            ).fetchone()
+        return row if row and row[0] is not None else None
+
+    def fresh_details(self, link: str) -> Optional[Dict]:
+        """Ficha técnica guardada, se ainda estiver dentro do TTL."""
+        row = self._details_row(link)
+        if row is None or time.time() - row[1] > self.spec_ttl:
+            return None
+        return json.loads(row[0])
+
+    def stored_details(self, link: str) -> Optional[Dict]:
+        """Última ficha técnica guardada, de qualquer idade (o replay não tem outra fonte)."""
+        row = self._details_row(link)
+        return json.loads(row[0]) if row is not None else None
+
+    def apply_fresh_details(self, products: List[Produto]) -> List[Produto]:
+        """Preenche `detalhes` dos produtos com ficha fresca; retorna os que ainda precisam ser buscados."""
+        remaining = []
+        for product in products:
+            details = self.fresh_details(product.link) if product.link else None
+            if details is None:
+                remaining.append(product)
+            else:
+                product.detalhes = details
+        return remaining
+
+    def latest_run(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT run_id FROM observations ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def load_products(self, run_id: Optional[str] = None, store: Optional[ProductStore] = None) -> List[Produto]:
+        """Produtos de uma execução (a última, por padrão), com ficha técnica guardada.
+
+        As observações são reaplicadas na ordem original num ProductStore, de modo que
+        relevância e filtros saem iguais aos da coleta que as registrou.
+        """
+        run_id = run_id or self.latest_run()
+        if run_id is None:
+            return []
+        store = store if store is not None else ProductStore()
+        with self._lock:
+            observations = self._conn.execute(
+                "SELECT nome, preco, avaliacao, link, filtro FROM observations WHERE run_id = ? ORDER BY id",
+                (run_id,)
+            ).fetchall()
+            details = dict(self._conn.execute(
+                "SELECT p.link, p.detalhes FROM products p "
+                "WHERE p.detalhes IS NOT NULL AND p.link IN (SELECT link FROM observations WHERE run_id = ?)",
+                (run_id,)
+            ).fetchall())
+        for nome, preco, avaliacao, link, filtro in observations:
+            store.upsert(Produto(nome=nome, preco=preco, avaliacao=avaliacao, link=link,
+                                 filtros_pesquisados=[filtro] if filtro else []))
+        products = store.to_list()
+        for product in products:
+            raw = details.get(canonical_link(product.link))
+            if raw:
+                product.detalhes = json.loads(raw)
+        return products
+
+    def price_history(self, link: str) -> List[Tuple[str, str, float, float]]:
+        """(run_id, observado em ISO, menor preço, avaliação) por execução, da mais antiga à mais recente."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, MIN(observed_at), MIN(preco), MAX(avaliacao) FROM observations "
+                "WHERE link = ? GROUP BY run_id ORDER BY MIN(observed_at)",
+                (canonical_link(link),)
+            ).fetchall()
+        return [(run, datetime.fromtimestamp(ts, timezone.utc).isoformat(), preco, avaliacao)
+                for run, ts, preco, avaliacao in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,85 @@
+# product_store.py
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from produto import Produto
+from config import REQUIRED_NAME_TERM
+from metrics import timed
+
+
+def normalize_name(nome: str) -> str:
+    return nome.lower().strip()
+
+
+def canonical_link(link: str) -> str:
+    """Link sem query string/fragmento (ex.: '?_lc=88&searchterm=notebook') e com host em minúsculas."""
+    if not link:
+        return ''
+    parts = urlsplit(link.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+
+
+class ProductStore:
+    """Produtos únicos indexados por nome normalizado (e opcionalmente por link canônico).
+
+    `upsert` é O(1): o primeiro produto com um nome entra com relevância 1; cada nova
+    ocorrência soma 1 à relevância e acrescenta os filtros ainda não vistos. A ordem de
+    inserção é preservada, de modo que o resultado não depende de como a coleta foi
+    dividida, desde que os lotes sejam entregues na mesma ordem.
+    """
+
+    def __init__(self, key_by_link: bool = False, required_term: Optional[str] = REQUIRED_NAME_TERM):
+        self.key_by_link = key_by_link
+        self.required_term = required_term.lower() if required_term else None
+        self._by_name: Dict[str, Produto] = {}
+        self._by_link: Dict[str, Produto] = {}
+        # incrementa a cada upsert; consumidores (ex.: o ranking) usam para invalidar caches
+        self.version = 0
+
+    def _find(self, name_key: str, link_key: str) -> Optional[Produto]:
+        existing = self._by_name.get(name_key)
+        if existing is None and self.key_by_link and link_key:
+            existing = self._by_link.get(link_key)
+        return existing
+
+    def upsert(self, produto: Produto) -> Optional[Produto]:
+        """Insere ou atualiza; retorna o produto guardado (ou None se o nome não tiver o termo exigido)."""
+        name_key = normalize_name(produto.nome)
+        if self.required_term and self.required_term not in name_key:
+            return None
+        link_key = canonical_link(produto.link) if self.key_by_link else ''
+        self.version += 1
+
+        existing = self._find(name_key, link_key)
+        if existing is not None:
+            for filtro in produto.filtros_pesquisados:
+                if filtro not in existing.filtros_pesquisados:
+                    existing.filtros_pesquisados.append(filtro)
+            existing.relevancia += 1
+            return existing
+
+        produto.relevancia = 1
+        self._by_name[name_key] = produto
+        if link_key:
+            self._by_link[link_key] = produto
+        return produto
+
+    @timed('merge')
+    def merge(self, products: Iterable[Produto]):
+        for produto in products:
+            self.upsert(produto)
+
+    def get(self, nome: str) -> Optional[Produto]:
+        return self._by_name.get(normalize_name(nome))
+
+    def to_list(self) -> List[Produto]:
+        return list(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __iter__(self) -> Iterator[Produto]:
+        return iter(list(self._by_name.values()))
+
+    def __contains__(self, nome: str) -> bool:
+        return normalize_name(nome) in self._by_name
@@ -0,0 +1,115 @@
+# rate_limiter.py
+"""Limitador de taxa compartilhado (token bucket com ajuste AIMD) para todas as navegações."""
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Tuple
+
+from config import (RATE_LIMIT_INITIAL, RATE_LIMIT_MIN, RATE_LIMIT_MAX, RATE_LIMIT_BURST,
+                    RATE_LIMIT_INCREASE, RATE_LIMIT_DECREASE, RATE_LIMIT_COOLDOWN)
+
+
+class AdaptiveRateLimiter:
+    """Token bucket cuja taxa sobe devagar a cada sucesso e cai pela metade a cada 429.
+
+    Um 429 também pausa a frota inteira (todos os workers que compartilham o limitador)
+    por um tempo que cresce com 429s consecutivos. Seguro entre threads; `acquire_async`
+    serve para o caminho asyncio.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_INITIAL, min_rate: float = RATE_LIMIT_MIN,
+                 max_rate: float = RATE_LIMIT_MAX, burst: float = RATE_LIMIT_BURST,
+                 increase: float = RATE_LIMIT_INCREASE, decrease: float = RATE_LIMIT_DECREASE,
+                 cooldown: float = RATE_LIMIT_COOLDOWN):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        # incrementado a cada 429: quem reservou antes e ainda está esperando reserva de novo
+        self._pause_epoch = 0
+        self._consecutive_429 = 0
+        self._lock = threading.Lock()
+        # métricas
+        self.requests = 0
+        self.throttled_429 = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        # durante uma pausa `_last` fica no fim dela: nada é reposto e a fila começa a contar dali
+        if now > self._last:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def _reserve(self, retry: bool = False) -> Tuple[float, int]:
+        """Reserva um token; retorna quanto esperar antes de usá-lo e a pausa vigente na reserva."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            delay = max(0.0, self._last - now) + max(0.0, -self._tokens) / self.rate
+            if not retry:
+                self.requests += 1
+            self.waited_seconds += delay
+            return delay, self._pause_epoch
+
+    def _paused_since(self, epoch: int) -> bool:
+        with self._lock:
+            return self._pause_epoch != epoch
+
+    def acquire(self):
+        delay, epoch = self._reserve()
+        # um 429 durante a espera invalida a vaga reservada: reservar outra, depois da pausa
+        while delay > 0:
+            time.sleep(delay)
+            if not self._paused_since(epoch):
+                return
+            delay, epoch = self._reserve(retry=True)
+
+    async def acquire_async(self):
+        delay, epoch = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            if not self._paused_since(epoch):
+                return
+            delay, epoch = self._reserve(retry=True)
+
+    def on_success(self):
+        with self._lock:
+            self._consecutive_429 = 0
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_429(self) -> float:
+        """Reduz a taxa e pausa a frota; retorna a duração da pausa."""
+        with self._lock:
+            self.throttled_429 += 1
+            self._consecutive_429 += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            pause = self.cooldown * (1.5 ** (self._consecutive_429 - 1))
+            now = time.monotonic()
+            # creditar o tempo até agora antes de mover `_last` para o fim da pausa
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + pause)
+            # a reposição recomeça no fim da pausa, com um token: depois dela as requisições saem
+            # espaçadas pela nova taxa, e não todas juntas. As vagas já reservadas e ainda em
+            # espera (saldo negativo) são descartadas; esses chamadores reservam de novo
+            self._last = max(self._last, self._paused_until)
+            self._tokens = 1.0
+            self._pause_epoch += 1
+        logging.warning(f"429 received. Rate lowered to {self.rate:.2f} req/s; pausing all workers for {pause:.1f}s.")
+        return pause
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'requests': self.requests,
+                'throttled_429': self.throttled_429,
+                'waited_seconds': self.waited_seconds,
+            }
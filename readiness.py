@@ -0,0 +1,152 @@
+# readiness.py
+"""Esperas baseadas em condições (com polling adaptativo) no lugar de time.sleep fixos."""
+import time
+import random
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config import (SELECTORS, SPEC_SELECTORS, READINESS_MIN_POLL, READINESS_MAX_POLL,
+                    NETWORK_IDLE_QUIET, JITTER_RANGE)
+from metrics import METRICS
+
+# assinatura do conjunto de cards visível: quantidade + links dos cards
+_CARDS_SIGNATURE_JS = """
+var cards = document.querySelectorAll(arguments[0]), links = [];
+for (var i = 0; i < cards.length; i++) {
+    var a = cards[i].querySelector('a');
+    links.push(a ? a.getAttribute('href') : '');
+}
+return cards.length + '|' + links.join('|');
+"""
+
+_SPEC_PRESENT_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    if (document.querySelector(selectors[i])) { return true; }
+}
+return false;
+"""
+
+# ms desde o fim do último recurso carregado. O fim mais recente fica guardado na página
+# e o buffer de resource timing é esvaziado antes de lotar (limite padrão: 250 entradas),
+# senão novos recursos deixam de aparecer e a contagem nunca estabiliza.
+_NETWORK_STATE_JS = """
+var entries = performance.getEntriesByType('resource'), last = window.__zoomLastResourceEnd || 0;
+for (var i = 0; i < entries.length; i++) { last = Math.max(last, entries[i].responseEnd); }
+window.__zoomLastResourceEnd = last;
+if (entries.length >= 200) { performance.clearResourceTimings(); }
+return [document.readyState, performance.now() - last];
+"""
+
+
+class WaitStats:
+    """Registra quanto tempo cada espera (por rótulo) realmente levou.
+
+    Cada amostra também entra no registro global de métricas como a etapa 'wait.<rótulo>'.
+    """
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._timeouts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, label: str, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self._samples[label].append(seconds)
+            if timed_out:
+                self._timeouts[label] += 1
+        METRICS.observe(f"wait.{label}", seconds)
+        if timed_out:
+            METRICS.incr(f"wait_timeouts.{label}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for label, samples in self._samples.items():
+                ordered = sorted(samples)
+                n = len(ordered)
+                result[label] = {
+                    'count': n,
+                    'timeouts': self._timeouts[label],
+                    'total': sum(ordered),
+                    'mean': sum(ordered) / n,
+                    'p50': ordered[n // 2],
+                    'p95': ordered[min(n - 1, int(n * 0.95))],
+                    'max': ordered[-1],
+                }
+            return result
+
+    def log_summary(self):
+        for label, s in sorted(self.summary().items()):
+            logging.info(
+                f"Wait '{label}': n={s['count']} timeouts={s['timeouts']} mean={s['mean']:.2f}s "
+                f"p50={s['p50']:.2f}s p95={s['p95']:.2f}s max={s['max']:.2f}s"
+            )
+
+
+class ReadinessWaiter:
+    """Espera condições no navegador com intervalo de polling crescente e registra a duração."""
+
+    def __init__(self, driver, timeout: float, stats: Optional[WaitStats] = None,
+                 min_poll: float = READINESS_MIN_POLL, max_poll: float = READINESS_MAX_POLL):
+        self.driver = driver
+        self.timeout = timeout
+        self.stats = stats if stats is not None else WaitStats()
+        self.min_poll = min_poll
+        self.max_poll = max_poll
+
+    def until(self, condition: Callable[[Any], Any], label: str, timeout: Optional[float] = None) -> Any:
+        """Chama `condition(driver)` até retornar algo verdadeiro; levanta TimeoutException se estourar."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        poll = self.min_poll
+        while True:
+            try:
+                value = condition(self.driver)
+                if value:
+                    self.stats.record(label, time.monotonic() - start)
+                    return value
+            except WebDriverException as e:
+                # TimeoutException herda de WebDriverException; aqui só esperamos
+                # erros transitórios (elemento sumiu durante re-render etc.)
+                logging.debug(f"Wait '{label}' condition error: {e}")
+            now = time.monotonic()
+            if now >= deadline:
+                self.stats.record(label, now - start, timed_out=True)
+                raise TimeoutException(f"Condition '{label}' not met after {timeout:.1f}s")
+            time.sleep(min(poll, deadline - now))
+            poll = min(poll * 1.5, self.max_poll)
+
+    def jitter(self, label: str = 'jitter', low: float = JITTER_RANGE[0], high: float = JITTER_RANGE[1]):
+        """Atraso aleatório residual (anti-bot), também registrado nas estatísticas."""
+        delay = random.uniform(low, high)
+        if delay > 0:
+            time.sleep(delay)
+        self.stats.record(label, delay)
+
+    # ---------- Condições ----------
+    def cards_signature(self) -> str:
+        return self.driver.execute_script(_CARDS_SIGNATURE_JS, SELECTORS['PRODUCT_CARD_CONTAINER'])
+
+    def wait_cards_changed(self, previous: str, label: str, timeout: Optional[float] = None) -> str:
+        """Espera o conjunto de cards mudar (após ordenar/paginar) e ter ao menos um card."""
+        def changed(driver):
+            current = self.cards_signature()
+            return current if current != previous and not current.startswith('0|') else None
+        return self.until(changed, label, timeout)
+
+    def wait_spec_present(self, label: str = 'spec_present', timeout: Optional[float] = None) -> bool:
+        return self.until(lambda d: d.execute_script(_SPEC_PRESENT_JS, SPEC_SELECTORS), label, timeout)
+
+    def wait_network_idle(self, label: str = 'network_idle', quiet: float = NETWORK_IDLE_QUIET,
+                          timeout: Optional[float] = None) -> bool:
+        """Documento carregado e nenhum recurso terminou de carregar nos últimos `quiet` segundos."""
+        def idle(driver):
+            ready, quiet_ms = driver.execute_script(_NETWORK_STATE_JS)
+            return ready == 'complete' and quiet_ms >= quiet * 1000
+        return self.until(idle, label, timeout)
@@ -0,0 +1,61 @@
+# replay.py
+"""Reexecuta a coleta a partir do cache de páginas, sem navegador."""
+import logging
+from typing import List, Optional
+
+from produto import Produto
+from config import BASE_URL
+from collectors import ProductCollectors
+from cache import HtmlCache, search_key, product_key
+from product_store import ProductStore
+from writers import ResultWriter
+from product_db import ProductDB
+
+
+class ReplayScraper:
+    """Mesma interface do ZoomScraper, mas lendo as páginas do HtmlCache.
+
+    Útil para ajustar seletores (collectors.py) ou o ranking (analisador.py) sem
+    navegar de novo, e como base para testes de regressão. Fichas que a coleta reaproveitou
+    da `product_db` (e por isso não estão no cache) são lidas de lá.
+    """
+
+    def __init__(self, cache: HtmlCache, writer: Optional[ResultWriter] = None,
+                 product_db: Optional[ProductDB] = None):
+        self.cache = cache
+        self.writer = writer
+        self.product_db = product_db
+        self.collectors = ProductCollectors(BASE_URL)
+
+    def search_and_collect(self, query: str, filters: List[str], pages_to_scrape: int = 3,
+                           store: Optional[ProductStore] = None, **_ignored) -> List[Produto]:
+        store = store if store is not None else ProductStore()
+        for filtro in ["Sem filtro"] + filters:
+            for page in range(1, pages_to_scrape + 1):
+                payload = self.cache.get(search_key(query, filtro, page))
+                if not payload:
+                    logging.warning(f"No cached page for '{query}' / '{filtro}' / page {page}.")
+                    continue
+                products = self.collectors.parse_products_from_page(payload, filtro)
+                if self.writer is not None:
+                    self.writer.write_products(products, query, filtro, page)
+                store.merge(products)
+        return store.to_list()
+
+    def fetch_details_for_top(self, products: List[Produto], top_n: int = 5, workers: Optional[int] = None):
+        for product in products[:top_n]:
+            html = self.cache.get(product_key(product.link))
+            if html is not None:
+                product.detalhes = self.collectors.get_product_details(html)
+            else:
+                stored = self.product_db.stored_details(product.link) if self.product_db is not None else None
+                if stored is None:
+                    logging.warning(f"No cached product page for {product.nome}.")
+                    product.detalhes = {"Detalhes": {"Erro": "Página não encontrada no cache."}}
+                    continue
+                product.detalhes = stored
+            if self.writer is not None:
+                self.writer.write_details(product)
+
+    def close(self):
+        pass
@@ -0,0 +1,336 @@
+# scheduler.py
+"""Coleta dividida em tarefas numa fila em disco (SQLite), com prioridade, retentativas e retomada.
+
+Cada (query, filtro, página) e cada página de produto é uma tarefa. O resultado de cada
+tarefa é gravado na fila assim que ela termina (checkpoint), então um crash ou reinício
+continua do ponto em que parou em vez de recomeçar a coleta.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from produto import Produto
+from config import JOBS_DB_PATH, JOB_MAX_ATTEMPTS, SCHEDULER_PROGRESS_INTERVAL, USE_HTTP_DETAILS
+from cache import search_key, product_key
+from product_store import ProductStore
+from analisador import AnalisadorProdutos
+from metrics import METRICS
+from collectors import NO_SPECS_ERROR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind          TEXT NOT NULL,
+    key           TEXT NOT NULL UNIQUE,
+    payload       TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    last_error    TEXT,
+    result        TEXT,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (kind, status, priority, id);
+"""
+
+# (id, payload) de uma tarefa reservada
+Job = Tuple[int, Dict[str, Any]]
+
+
+class JobQueue:
+    """Fila durável de tarefas: pending -> running -> done | failed.
+
+    Menor `priority` sai primeiro. Uma tarefa que falha volta para pending até esgotar
+    `max_attempts`. Tarefas que estavam em execução quando o processo morreu voltam para
+    pending em `recover()`; as que falharam de vez só voltam com `retry_failed()` (--resume).
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def reset(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs")
+
+    def recover(self) -> int:
+        """Devolve à fila as tarefas interrompidas; retorna quantas eram."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+            return cur.rowcount
+
+    def retry_failed(self) -> int:
+        """Devolve à fila, com as tentativas zeradas, as tarefas que esgotaram as retentativas."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'",
+                (time.time(),)
+            )
+            return cur.rowcount
+
+    def enqueue(self, kind: str, key: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = JOB_MAX_ATTEMPTS) -> bool:
+        """Adiciona a tarefa se a chave ainda não existir; retorna se foi adicionada."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, key, payload, priority, max_attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(payload, ensure_ascii=False), priority, max_attempts, time.time())
+            )
+            return cur.rowcount > 0
+
+    def claim(self, kind: str, limit: int = 1) -> List[Job]:
+        """Reserva até `limit` tarefas pendentes do tipo, por prioridade e ordem de criação."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM jobs WHERE kind = ? AND status = 'pending' "
+                "ORDER BY priority, id LIMIT ?", (kind, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(time.time(), job_id) for job_id, _ in rows]
+            )
+        return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+    def pending(self, kind: str) -> List[Job]:
+        """Tarefas pendentes do tipo, sem reservá-las (não contam tentativa)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM jobs WHERE kind = ? AND status = 'pending' ORDER BY priority, id", (kind,)
+            ).fetchall()
+        return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+    def complete(self, job_id: int, result: Any):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, last_error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False), time.time(), job_id)
+            )
+
+    def fail(self, job_id: int, error: str, result: Any = None) -> bool:
+        """Registra a falha (e o resultado parcial, se houver); retorna True se a tarefa ainda será tentada de novo."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END, "
+                "last_error = ?, result = ?, updated_at = ? WHERE id = ?",
+                (error, None if result is None else json.dumps(result, ensure_ascii=False), time.time(), job_id)
+            )
+            status = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        return status == 'pending'
+
+    def counts(self, kind: Optional[str] = None) -> Dict[str, int]:
+        query = "SELECT status, COUNT(*) FROM jobs" + (" WHERE kind = ?" if kind else "") + " GROUP BY status"
+        with self._lock:
+            rows = self._conn.execute(query, (kind,) if kind else ()).fetchall()
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self, kind: str, include_failed: bool = False) -> List[Tuple[Dict[str, Any], Any]]:
+        """(payload, resultado) das tarefas concluídas do tipo, na ordem em que foram criadas.
+
+        Com `include_failed`, entram também as que falharam de vez deixando um resultado parcial.
+        """
+        statuses = ('done', 'failed') if include_failed else ('done',)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT payload, result FROM jobs WHERE kind = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                "AND result IS NOT NULL ORDER BY id", (kind, *statuses)
+            ).fetchall()
+        return [(json.loads(payload), json.loads(result)) for payload, result in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CrawlScheduler:
+    """Executa uma coleta (buscas e depois fichas técnicas dos melhores) a partir da JobQueue.
+
+    As buscas de todas as queries entram primeiro, com prioridade pela página (as
+    primeiras páginas de todos os filtros saem antes). Quando não restam buscas, os
+    produtos de cada query são mesclados na ordem (filtro, página), ranqueados, e os
+    `top_n` viram tarefas de detalhe. Antes dos navegadores, as tarefas de detalhe passam
+    todas juntas pela `product_db` e pelo caminho HTTP (como em `fetch_details_for_top`);
+    só as que sobram são abertas no navegador. Reexecutar com a mesma fila só refaz o que faltou.
+    """
+
+    def __init__(self, scraper, queue: JobQueue, workers: int = 1, use_http: bool = USE_HTTP_DETAILS,
+                 progress_interval: float = SCHEDULER_PROGRESS_INTERVAL):
+        self.scraper = scraper
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.use_http = use_http
+        self.progress_interval = progress_interval
+        self._started = time.monotonic()
+        self._done_at_start = 0
+        self._last_report = 0.0
+        self._report_lock = threading.Lock()
+
+    # ---------- Planejamento ----------
+    def plan_searches(self, queries: List[str], filters: List[str], pages_to_scrape: int):
+        added = 0
+        for query in dict.fromkeys(queries):
+            for filtro in ["Sem filtro"] + filters:
+                for page in range(1, pages_to_scrape + 1):
+                    added += self.queue.enqueue(
+                        'search', search_key(query, filtro, page),
+                        {'query': query, 'filtro': filtro, 'page': page}, priority=page
+                    )
+        logging.info(f"{added} search jobs queued.")
+
+    def _plan_details(self, ranked: Dict[str, List[Produto]], top_n: int):
+        added = 0
+        for query, products in ranked.items():
+            for rank, product in enumerate(products[:top_n]):
+                added += self.queue.enqueue(
+                    'detail', product_key(product.link),
+                    {'query': query, 'produto': asdict(product)}, priority=rank
+                )
+        logging.info(f"{added} detail jobs queued.")
+
+    # ---------- Execução ----------
+    def run(self, queries: List[str], filters: List[str], pages_to_scrape: int = 3,
+            top_n: int = 5) -> Dict[str, List[Produto]]:
+        """Coleta tudo o que faltar e retorna, por query, os produtos ranqueados (com detalhes no top)."""
+        recovered = self.queue.recover()
+        if recovered:
+            logging.info(f"Resuming: {recovered} interrupted jobs returned to the queue.")
+        self._done_at_start = self.queue.counts()['done']
+        self._started = time.monotonic()
+
+        self.plan_searches(queries, filters, pages_to_scrape)
+        self._drain('search', self._run_search)
+
+        ranked = self._ranked_products(queries)
+        self._plan_details(ranked, top_n)
+        self._prefetch_details()
+        self._drain('detail', self._run_detail)
+        self._apply_details(ranked)
+
+        self._report(force=True)
+        failed = self.queue.counts()['failed']
+        if failed:
+            logging.warning(f"{failed} jobs failed after all retries. Results are partial; rerun with --resume to retry.")
+        return ranked
+
+    def _prefetch_details(self):
+        """Conclui de uma vez as tarefas de detalhe com ficha fresca na base ou obtida por HTTP."""
+        jobs = self.queue.pending('detail')
+        if not jobs:
+            return
+        products = {job_id: Produto(**payload['produto']) for job_id, payload in jobs}
+        todo = self.scraper.apply_fresh_details(list(products.values()))
+        if self.use_http and todo:
+            todo = self.scraper.fetch_details_http(todo)
+        left = {id(product) for product in todo}
+        for job_id, product in products.items():
+            if id(product) not in left:
+                self.queue.complete(job_id, product.detalhes)
+        logging.info(f"{len(products) - len(left)}/{len(products)} detail jobs done without a browser.")
+
+    def _drain(self, kind: str, task):
+        # o pool de sessões do scraper é reaproveitado; as retentativas ficam com a fila, então o
+        # pool só troca navegadores que morreram, sem repetir a tarefa
+        pool = self.scraper.session_pool(self.workers)
+
+        def lane():
+            # cada navegador pega a próxima tarefa assim que termina a sua: uma página lenta
+            # não deixa os outros parados esperando o lote
+            while True:
+                jobs = self.queue.claim(kind, 1)
+                if not jobs:
+                    return
+                job_id, payload = jobs[0]
+                if pool.run(task, jobs[0], max_retries=0) is None:
+                    # o pool não conseguiu um navegador para a tarefa
+                    self._failed(job_id, f"{kind} {payload}", RuntimeError("no browser available"))
+
+        # uma tarefa que falhou volta para pending; repetir enquanto houver tarefas do tipo
+        while self.queue.counts(kind)['pending']:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for future in [executor.submit(lane) for _ in range(self.workers)]:
+                    future.result()
+
+    def _run_search(self, worker, job: Job):
+        job_id, payload = job
+        try:
+            products = worker.collect_page(payload['query'], payload['filtro'], payload['page'], raise_errors=True)
+        except Exception as e:
+            self._failed(job_id, f"search {payload}", e)
+            return False
+        self.queue.complete(job_id, [asdict(p) for p in products])
+        self._report()
+        return True
+
+    def _run_detail(self, worker, job: Job):
+        job_id, payload = job
+        product = Produto(**payload['produto'])
+        try:
+            worker.fetch_product_detail(product)
+            error = product.detalhes.get("Detalhes", {}).get("Erro")
+            # página sem ficha técnica é um resultado, não uma falha: repetir só gastaria navegações
+            if error and error != NO_SPECS_ERROR:
+                raise RuntimeError(error)
+        except Exception as e:
+            # o `detalhes` com o erro fica guardado: se a tarefa desistir, ele vai para o CSV
+            self._failed(job_id, f"details for {product.nome}", e, result=product.detalhes or None)
+            return False
+        self.queue.complete(job_id, product.detalhes)
+        self._report()
+        return True
+
+    def _failed(self, job_id: int, what: str, error: Exception, result: Any = None):
+        retry = self.queue.fail(job_id, f"{type(error).__name__}: {error}", result)
+        METRICS.incr('jobs_retried' if retry else 'jobs_failed')
+        logging.warning(f"Job {what} failed ({error}). " + ("Will retry." if retry else "Giving up."))
+
+    # ---------- Resultados ----------
+    def _ranked_products(self, queries: List[str]) -> Dict[str, List[Produto]]:
+        # os resultados vêm na ordem de criação das tarefas (filtro, página), como na coleta sequencial
+        stores = {query: ProductStore() for query in dict.fromkeys(queries)}
+        for payload, products in self.queue.results('search'):
+            store = stores.get(payload['query'])
+            if store is not None:
+                store.merge(Produto(**p) for p in products)
+        return {query: AnalisadorProdutos(store.to_list()).rankear_produtos() for query, store in stores.items()}
+
+    def _apply_details(self, ranked: Dict[str, List[Produto]]):
+        details = {payload['produto']['link']: result
+                   for payload, result in self.queue.results('detail', include_failed=True)}
+        for products in ranked.values():
+            for product in products:
+                if product.link in details:
+                    product.detalhes = details[product.link]
+
+    # ---------- Progresso ----------
+    def _report(self, force: bool = False):
+        now = time.monotonic()
+        with self._report_lock:
+            if not force and now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+        counts = self.queue.counts()
+        total = sum(counts.values())
+        done_now = counts['done'] - self._done_at_start
+        elapsed = max(now - self._started, 1e-9)
+        rate = done_now / elapsed * 60
+        remaining = counts['pending'] + counts['running']
+        eta = f"{remaining / (rate / 60):.0f}s" if rate else "?"
+        METRICS.set_gauge('jobs.done', counts['done'])
+        METRICS.set_gauge('jobs.pending', remaining)
+        METRICS.set_gauge('jobs.failed', counts['failed'])
+        logging.info(f"Progress: {counts['done']}/{total} jobs done, {counts['failed']} failed, "
+                     f"{rate:.1f} jobs/min, ETA {eta}.")
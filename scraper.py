@@ -1,55 +1,190 @@
 # scraper.py (with HTTP 429 retry for product details)
 import time
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union, Dict
+from urllib.parse import urlencode
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (TimeoutException, NoSuchElementException)
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, WebDriverException)
 import random
 
 from produto import Produto
-from config import SELECTORS, BASE_URL, WAIT_TIMEOUT, RETRY_ATTEMPTS
+from config import (SELECTORS, BASE_URL, WAIT_TIMEOUT, RETRY_ATTEMPTS, DETAIL_WORKERS, SEARCH_WORKERS,
+                    SEARCH_PATH, SEARCH_QUERY_PARAM, SORT_PARAM, PAGE_PARAM, FILTER_SORT_VALUES,
+                    EXTRACTION_MODE, CHANGE_WAIT_TIMEOUT, SPEC_WAIT_TIMEOUT, USE_HTTP_DETAILS,
+                    BROWSER_PROFILE, LEAN_BLOCKED_URLS, FETCH_HYDRATION_DATA)
 from collectors import ProductCollectors
+from readiness import ReadinessWaiter, WaitStats
+from cache import HtmlCache, search_key, product_key
+import extraction
+from pool import ScraperPool
+from http_fetch import HttpDetailFetcher
+from rate_limiter import AdaptiveRateLimiter
+from product_store import ProductStore
+from writers import ResultWriter
+from product_db import ProductDB
+from metrics import METRICS, timed
+
+
+def build_chrome_options(headless: bool, profile: str = 'default') -> webdriver.ChromeOptions:
+    """Opções do Chrome. O perfil 'lean' não baixa imagens/mídia e desliga recursos desnecessários."""
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1280,2000')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--log-level=2')
+    if profile == 'lean':
+        # só lemos o DOM: não esperar o evento load (imagens, iframes, anúncios)
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-notifications')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--disable-sync')
+        options.add_argument('--mute-audio')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+            'profile.managed_default_content_settings.notifications': 2,
+            'profile.managed_default_content_settings.geolocation': 2,
+        })
+    return options
 
 
 class ZoomScraper:
-    def __init__(self, headless: bool = True):
-        options = webdriver.ChromeOptions()
-        if headless:
-            options.add_argument('--headless=new')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1280,2000')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--log-level=2')
-        service = Service()
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
+    def __init__(self, headless: bool = True, extraction_mode: str = EXTRACTION_MODE,
+                 wait_stats: Optional[WaitStats] = None, cache: Optional[HtmlCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, profile: str = BROWSER_PROFILE,
+                 writer: Optional[ResultWriter] = None, product_db: Optional[ProductDB] = None,
+                 start_driver: bool = True):
+        self.headless = headless
+        self.extraction_mode = extraction_mode
+        self.profile = profile
+        self.cache = cache
+        # saída incremental (writers.py): produtos por página e fichas técnicas assim que extraídos
+        self.writer = writer
+        # base persistente (product_db.py): histórico de preços e fichas técnicas ainda válidas
+        self.product_db = product_db
+        # compartilhado com os workers de pool: toda navegação passa por ele
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        # com `start_driver=False` o Chrome só abre no primeiro uso de `driver` (no modo
+        # scheduler quem navega são os workers do pool e o scraper principal nunca o abre)
+        self._driver = None
+        self._wait: Optional[WebDriverWait] = None
+        self._readiness: Optional[ReadinessWaiter] = None
+        # workers de pool compartilham estatísticas e limitador do scraper principal, que os reporta
+        self._owns_wait_stats = wait_stats is None
+        self.wait_stats = wait_stats if wait_stats is not None else WaitStats()
+        self._owns_rate_limiter = rate_limiter is None
+        # pool de sessões reutilizado entre chamadas (criado sob demanda, fechado em close())
+        self._pool: Optional[ScraperPool] = None
         self.collectors = ProductCollectors(BASE_URL)
+        if start_driver:
+            _ = self.driver
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        if self._driver is None:
+            self._driver = webdriver.Chrome(service=Service(), options=build_chrome_options(self.headless, self.profile))
+            if self.profile == 'lean':
+                self._block_resources()
+        return self._driver
+
+    @property
+    def wait(self) -> WebDriverWait:
+        if self._wait is None:
+            self._wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
+        return self._wait
+
+    @property
+    def readiness(self) -> ReadinessWaiter:
+        if self._readiness is None:
+            self._readiness = ReadinessWaiter(self.driver, WAIT_TIMEOUT, self.wait_stats)
+        return self._readiness
+
+    def _block_resources(self):
+        """Bloqueia fontes, mídia e domínios de terceiros via CDP (Network.setBlockedURLs)."""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+        except WebDriverException as e:
+            logging.warning(f"Could not set blocked URLs through CDP: {e}")
 
-    def _retry_get_page_source(self) -> Optional[str]:
+    def _retry_get_page_source(self) -> Optional[Union[str, List[str], List[Dict[str, Optional[str]]]]]:
         for attempt in range(RETRY_ATTEMPTS):
             try:
-                self.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, SELECTORS['PRODUCT_CARD_CONTAINER'])))
+                with METRICS.timer('wait.products'):
+                    self.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, SELECTORS['PRODUCT_CARD_CONTAINER'])))
                 logging.info(f"Products loaded. Attempt {attempt+1}/{RETRY_ATTEMPTS}.")
-                return self.driver.page_source
+                self.rate_limiter.on_success()
+                return self._extract_cards()
             except TimeoutException:
+                if self._is_429(self.driver.page_source):
+                    self.rate_limiter.on_429()
+                    self._refresh()
+                    continue
                 logging.warning(f"Timeout waiting for products. Retrying... (Attempt {attempt+1})")
-                time.sleep(2 ** attempt + random.uniform(0, 1))
+                METRICS.incr('search_timeouts')
+                with METRICS.timer('sleep.backoff'):
+                    time.sleep(2 ** attempt + random.uniform(0, 1))
+        METRICS.incr('pages_failed')
         return None
 
-    def search_and_collect(self, query: str, filters: List[str], pages_to_scrape: int = 3) -> List[Produto]:
-        all_products: List[Produto] = []
+    def _navigate(self, url: str):
+        """Toda abertura de URL passa pelo limitador de taxa compartilhado."""
+        with METRICS.timer('throttle'):
+            self.rate_limiter.acquire()
+        with METRICS.timer('navigation'):
+            self.driver.get(url)
+
+    def _refresh(self):
+        with METRICS.timer('throttle'):
+            self.rate_limiter.acquire()
+        with METRICS.timer('navigation.refresh'):
+            self.driver.refresh()
+
+    def _extract_cards(self) -> Union[str, List[str], List[Dict[str, Optional[str]]]]:
+        """Traz do navegador só o que o modo de extração pede (HTML completo, fragmentos ou registros)."""
+        with METRICS.timer('transfer.search'):
+            if self.extraction_mode == 'json':
+                return extraction.extract_card_records(self.driver)
+            if self.extraction_mode == 'fragments':
+                return extraction.extract_card_fragments(self.driver, self.collectors.use_structured_data,
+                                                         FETCH_HYDRATION_DATA)
+            return self.driver.page_source
+
+    def _detail_html(self) -> str:
+        """HTML do container de specs quando possível; senão a página inteira."""
+        with METRICS.timer('transfer.product'):
+            if self.extraction_mode != 'page_source':
+                fragment = extraction.extract_spec_container(self.driver, self.collectors.use_structured_data)
+                if fragment:
+                    return fragment
+            return self.driver.page_source
+
+    def search_and_collect(self, query: str, filters: List[str], pages_to_scrape: int = 3,
+                           parallel: bool = False, workers: Optional[int] = None,
+                           store: Optional[ProductStore] = None) -> List[Produto]:
+        """Coleta a busca em todos os filtros/páginas; `store` permite acumular entre chamadas."""
+        store = store if store is not None else ProductStore()
+        if parallel:
+            return self.search_many([query], filters, pages_to_scrape, workers, stores={query: store})[query]
+
         full_filter_list = ["Sem filtro"] + filters
         try:
             logging.info(f"Navigating to search page for query: '{query}'")
-            self.driver.get(BASE_URL)
+            self._navigate(BASE_URL)
 
             search_box = self.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, SELECTORS['SEARCH_INPUT'])))
             search_box.clear()
             search_box.send_keys(query)
+            self.rate_limiter.acquire()
             search_box.submit()
 
             # para cada filtro (inclui 'Sem filtro')
@@ -66,47 +201,127 @@ class ZoomScraper:
                     page_source = self._retry_get_page_source()
                     if not page_source:
                         continue
+                    self._cache_put(search_key(query, filtro, page), page_source)
                     products = self.collectors.parse_products_from_page(page_source, filtro)
-                    self._merge_products(all_products, products)
-            return all_products
+                    self._write_products(products, query, filtro, page)
+                    store.merge(products)
+            return store.to_list()
         except Exception as e:
             logging.error(f"Unexpected error during search: {e}", exc_info=True)
-            return all_products
-
-    def _merge_products(self, existing: List[Produto], new: List[Produto]):
-        for p_new in new:
-            if "notebook" not in p_new.nome.lower():
-                continue
-            found = False
-            for p_existing in existing:
-                if p_existing.nome.lower().strip() == p_new.nome.lower().strip():
-                    if p_new.filtros_pesquisados[0] not in p_existing.filtros_pesquisados:
-                        p_existing.filtros_pesquisados.append(p_new.filtros_pesquisados[0])
-                    p_existing.relevancia += 1
-                    found = True
-                    break
-            if not found:
-                p_new.relevancia = 1
-                existing.append(p_new)
+            return store.to_list()
+
+    def _build_search_url(self, query: str, filtro: str, page: int) -> str:
+        params = {SEARCH_QUERY_PARAM: query}
+        sort_values = FILTER_SORT_VALUES.get(filtro)
+        if sort_values:
+            params[SORT_PARAM] = sort_values[0]
+        if page > 1:
+            params[PAGE_PARAM] = page
+        return f"{BASE_URL.rstrip('/')}/{SEARCH_PATH}?{urlencode(params)}"
+
+    def collect_page(self, query: str, filtro: str, page: int, raise_errors: bool = False) -> List[Produto]:
+        """Coleta uma página de busca via URL direta.
+
+        Por padrão erros viram lista vazia; com `raise_errors` (scheduler.py) eles são
+        propagados, inclusive quando os cards não carregam, para a tarefa ser repetida.
+        """
+        url = self._build_search_url(query, filtro, page)
+        try:
+            logging.info(f"Collecting '{filtro}' from {url}")
+            self._navigate(url)
+            page_source = self._retry_get_page_source()
+            if not page_source:
+                if raise_errors:
+                    raise TimeoutException(f"No products loaded from {url}")
+                return []
+            self._cache_put(search_key(query, filtro, page), page_source)
+            products = self.collectors.parse_products_from_page(page_source, filtro)
+            self._write_products(products, query, filtro, page)
+            return products
+        except Exception as e:
+            if raise_errors:
+                raise
+            logging.error(f"Unexpected error collecting {url}: {e}", exc_info=True)
+            return []
+
+    def search_many(self, queries: List[str], filters: List[str], pages_to_scrape: int = 3,
+                    workers: Optional[int] = None,
+                    stores: Optional[Dict[str, ProductStore]] = None) -> Dict[str, List[Produto]]:
+        """Coleta várias buscas pelas sessões do pool e retorna os produtos de cada query.
+
+        Cada trio (query, filtro, página) é uma tarefa independente, aberta via URL direta.
+        As tarefas são distribuídas entre os navegadores do pool e os resultados de cada
+        query são mesclados na mesma ordem do caminho sequencial (filtro, depois página),
+        de modo que a lista final e as contagens de relevância são idênticas.
+        """
+        queries = list(dict.fromkeys(queries))
+        full_filter_list = ["Sem filtro"] + filters
+        jobs: List[Tuple[str, str, int]] = [
+            (query, filtro, page)
+            for query in queries
+            for filtro in full_filter_list
+            for page in range(1, pages_to_scrape + 1)
+        ]
+        workers = SEARCH_WORKERS if workers is None else workers
+        logging.info(f"Collecting {len(jobs)} (query, filter, page) jobs for {len(queries)} queries with {workers} workers.")
+
+        results = self.session_pool(workers).map(
+            lambda worker, job: worker.collect_page(*job), jobs, concurrency=workers
+        )
+
+        stores = dict(stores or {})
+        for query in queries:
+            stores.setdefault(query, ProductStore())
+        for (query, _, _), products in zip(jobs, results):
+            stores[query].merge(products or [])
+        return {query: stores[query].to_list() for query in queries}
+
+    def session_pool(self, workers: int) -> ScraperPool:
+        """Pool persistente de navegadores; cresce se uma chamada pedir mais workers."""
+        if self._pool is None:
+            self._pool = ScraperPool(workers, self._spawn_worker)
+        else:
+            self._pool.size = max(self._pool.size, workers)
+        return self._pool
+
+    def _write_products(self, products: List[Produto], query: str, filtro: str, page: int):
+        # chamado uma vez por página coletada com sucesso
+        METRICS.incr('pages_collected')
+        METRICS.incr('products_parsed', len(products))
+        if self.writer is not None:
+            self.writer.write_products(products, query, filtro, page)
+        if self.product_db is not None:
+            self.product_db.record_observations(products, query, filtro, page)
+
+    def _write_details(self, product: Produto):
+        if self.writer is not None:
+            self.writer.write_details(product)
+        if self.product_db is not None:
+            self.product_db.save_details(product)
+
+    def _cache_put(self, key: str, payload):
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(key, payload)
+        except OSError as e:
+            logging.warning(f"Could not write '{key}' to the page cache: {e}")
 
     def _apply_filter(self, filter_name: str) -> bool:
         try:
             select_elem = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELECTORS['SORT_SELECT'])))
 
             # mapear nomes -> valores comuns
-            mapping = {
-                'Mais Relevantes': ['relevance', 'relevancia', 'relevance_desc'],
-                'Melhor Avaliados': ['rating_desc', 'best_rating', 'avaliacao_desc'],
-                'Menor Preço': ['price_asc', 'menor_preco', 'priceasc']
-            }
-            value_candidates = mapping.get(filter_name, [])
+            value_candidates = FILTER_SORT_VALUES.get(filter_name, [])
 
             # tentar via javascript alterar select (mais robusto)
+            previous = self.readiness.cards_signature()
             changed = False
             for opt in select_elem.find_elements(By.TAG_NAME, 'option'):
                 val = (opt.get_attribute('value') or '').lower()
                 text = (opt.text or '').strip()
                 if text.lower() == filter_name.lower() or any(vc in val for vc in value_candidates):
+                    self.rate_limiter.acquire()
                     self.driver.execute_script(
                         "arguments[0].selected=true; arguments[0].dispatchEvent(new Event('change'));", opt
                     )
@@ -115,7 +330,11 @@ class ZoomScraper:
 
             if changed:
                 logging.info(f"Filter '{filter_name}' applied.")
-                time.sleep(random.uniform(1.5, 3.0))
+                try:
+                    self.readiness.wait_cards_changed(previous, 'filter_applied', CHANGE_WAIT_TIMEOUT)
+                except TimeoutException:
+                    logging.warning(f"Product list did not change after applying '{filter_name}'.")
+                self.readiness.jitter()
                 return True
 
             logging.warning(f"Could not apply filter '{filter_name}'. Proceeding without it.")
@@ -128,11 +347,13 @@ class ZoomScraper:
         try:
             xpath = SELECTORS['NEXT_PAGE'].format(page_num=page_num)
             elem = self.wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
+            previous = self.readiness.cards_signature()
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", elem)
-            time.sleep(0.5)
+            self.readiness.until(EC.element_to_be_clickable((By.XPATH, xpath)), 'page_link_clickable')
+            self.rate_limiter.acquire()
             elem.click()
             logging.info(f"Navigated to page {page_num}")
-            time.sleep(1.0)
+            self.readiness.wait_cards_changed(previous, 'page_changed', CHANGE_WAIT_TIMEOUT)
         except Exception:
             logging.warning(f"Could not navigate to page {page_num}")
 
@@ -142,54 +363,179 @@ class ZoomScraper:
         return ("http error 429" in text) or ("too many requests" in text) or (">429<" in text)
 
     def _retry_if_429(self, max_retries: int = 2) -> str:
-        """Espera e atualiza a página se detectar 429. Retorna o HTML final."""
-        backoff = 6.0
+        """Avisa o limitador e atualiza a página se detectar 429. Retorna o HTML final.
+
+        A espera em si fica com o limitador compartilhado, que pausa todos os workers.
+        """
         for attempt in range(max_retries + 1):
-            html = self.driver.page_source
+            html = self._detail_html()
             if not self._is_429(html):
+                self.rate_limiter.on_success()
                 return html
-            logging.warning(f"429 detectado ao abrir a página de produto. Esperando {backoff:.0f}s e tentando novamente... (tentativa {attempt+1}/{max_retries})")
-            time.sleep(backoff + random.uniform(0.5, 1.5))
-            self.driver.refresh()
-            # pequeno tempo adicional para re-render
-            time.sleep(2.5 + random.uniform(0, 1.0))
-            backoff *= 1.5
+            logging.warning(f"429 detectado ao abrir a página de produto. Tentando novamente... (tentativa {attempt+1}/{max_retries})")
+            self.rate_limiter.on_429()
+            self._refresh()
+            # esperar o re-render em vez de um tempo fixo
+            try:
+                self.readiness.wait_network_idle('refresh_idle')
+            except TimeoutException:
+                pass
         # retorna o último HTML, mesmo que ainda seja 429
         return self.driver.page_source
 
-    def fetch_details_for_top(self, products: List[Produto], top_n: int = 5):
-        top = products[:top_n]
-        for product in top:
+    def _spawn_worker(self) -> 'ZoomScraper':
+        """Novo scraper com a mesma configuração, compartilhando as estatísticas de espera."""
+        return ZoomScraper(headless=self.headless, extraction_mode=self.extraction_mode, profile=self.profile,
+                           wait_stats=self.wait_stats, cache=self.cache,
+                           rate_limiter=self.rate_limiter, writer=self.writer, product_db=self.product_db)
+
+    def is_alive(self) -> bool:
+        try:
+            _ = self.driver.current_url
+            return True
+        except Exception:
+            # com o chromedriver morto o selenium deixa escapar o erro do urllib3 (MaxRetryError),
+            # que não é WebDriverException
+            return False
+
+    def fetch_details_for_top(self, products: List[Produto], top_n: int = 5, workers: Optional[int] = None,
+                              use_http: bool = USE_HTTP_DETAILS):
+        """Abre a página de cada um dos `top_n` produtos e preenche `Produto.detalhes`.
+
+        Produtos com ficha ainda válida na `product_db` não são abertos de novo.
+        Com `use_http`, tenta antes buscar as páginas por HTTP (http_fetch.py); só os produtos
+        sem container de specs na resposta passam pelo navegador.
+        Com `workers > 1` as páginas são abertas em paralelo por um pool de navegadores
+        (cada um com seu próprio driver); o driver desta instância não é usado nesse caso.
+        """
+        top = self.apply_fresh_details(products[:top_n])
+        if not top:
+            return
+        if use_http and top:
+            top = self.fetch_details_http(top)
+            if not top:
+                return
+        workers = DETAIL_WORKERS if workers is None else workers
+        if workers <= 1 or len(top) <= 1:
+            for product in top:
+                self.fetch_product_detail(product)
+            return
+
+        logging.info(f"Fetching details for {len(top)} products with {workers} workers.")
+        self.session_pool(workers).map(
+            lambda worker, product: worker.fetch_product_detail(product), top, concurrency=workers
+        )
+
+    def apply_fresh_details(self, products: List[Produto]) -> List[Produto]:
+        """Preenche os produtos com ficha ainda válida na `product_db`; retorna os que precisam ser buscados.
+
+        As fichas reaproveitadas vão para o writer, mas não de volta para a base: regravá-las
+        renovaria `detalhes_at` e a validade nunca venceria.
+        """
+        if self.product_db is None or not products:
+            return products
+        remaining = self.product_db.apply_fresh_details(products)
+        pending = {id(product) for product in remaining}
+        reused = [product for product in products if id(product) not in pending]
+        METRICS.incr('details_fresh_in_db', len(reused))
+        logging.info(f"{len(reused)}/{len(products)} product details still fresh in the product database.")
+        if self.writer is not None:
+            for product in reused:
+                self.writer.write_details(product)
+        return remaining
+
+    def fetch_details_http(self, products: List[Produto]) -> List[Produto]:
+        """Busca as fichas por HTTP num lote só; retorna os produtos que ainda precisam do navegador."""
+        if not HttpDetailFetcher.available():
+            logging.warning("aiohttp is not installed. Using the browser for product details.")
+            return products
+        fetcher = HttpDetailFetcher(self.collectors, rate_limiter=self.rate_limiter)
+        with METRICS.timer('detail.http'):
+            remaining = fetcher.fetch(products)
+        METRICS.incr('details_http', len(products) - len(remaining))
+        for link, html in fetcher.pages.items():
+            self._cache_put(product_key(link), html)
+        for product in products:
+            if product.link in fetcher.pages:
+                self._write_details(product)
+        logging.info(f"{len(products) - len(remaining)}/{len(products)} product details fetched over HTTP.")
+        return remaining
+
+    @timed('detail.browser')
+    def fetch_product_detail(self, product: Produto):
+        """Abre a página do produto neste navegador; erros viram `detalhes` com a chave "Erro"."""
+        try:
+            logging.info(f"Fetching details for product: {product.nome}")
+            self._navigate(product.link)
+
+            # abrir aba "Ficha técnica" se existir
             try:
-                logging.info(f"Fetching details for product: {product.nome}")
-                self.driver.get(product.link)
+                ficha = self.wait.until(EC.element_to_be_clickable((By.XPATH, SELECTORS['SPEC_TAB_XPATH'])))
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", ficha)
+                self.readiness.until(EC.element_to_be_clickable((By.XPATH, SELECTORS['SPEC_TAB_XPATH'])), 'spec_tab_clickable')
+                ficha.click()
+            except Exception:
+                pass
 
-                # abrir aba "Ficha técnica" se existir
+            # rolar para provável container de specs e esperar ele aparecer
+            self.driver.execute_script("window.scrollBy(0, 600);")
+            try:
+                self.readiness.wait_spec_present(timeout=SPEC_WAIT_TIMEOUT)
+            except TimeoutException:
+                logging.warning(f"Spec container not found yet for {product.nome}.")
+                # sem container ainda: dar uma última chance para a página terminar de carregar.
+                # Com o container presente essa espera só custaria tempo (anúncios e
+                # rastreadores mantêm a rede ocupada)
                 try:
-                    ficha = self.wait.until(EC.element_to_be_clickable((By.XPATH, SELECTORS['SPEC_TAB_XPATH'])))
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", ficha)
-                    time.sleep(0.6)
-                    ficha.click()
-                    time.sleep(0.8)
-                except Exception:
+                    self.readiness.wait_network_idle(timeout=SPEC_WAIT_TIMEOUT)
+                except TimeoutException:
                     pass
+            self.readiness.jitter()
 
-                # rolar para provável container de specs
-                self.driver.execute_script("window.scrollBy(0, 600);")
-                time.sleep(random.uniform(2.5, 4.0))
+            # --- Retry específico para HTTP 429 ---
+            html = self._retry_if_429(max_retries=2)
+
+            details = self.collectors.get_product_details(html)
+            if "Erro" in details.get("Detalhes", {}) and self.extraction_mode != 'page_source':
+                # o fragmento não rendeu specs: tentar os fallbacks na página inteira
+                html = self.driver.page_source
+                details = self.collectors.get_product_details(html)
+            product.detalhes = details
+            self._write_details(product)
+            if not self._is_429(html):
+                self._cache_put(product_key(product.link), html)
+            METRICS.incr('details_browser')
+            logging.info(f"Details fetched successfully for {product.nome}.")
+        except TimeoutException as e:
+            METRICS.incr('details_failed')
+            logging.error(f"Timeout while getting details for {product.nome}: {e}")
+            product.detalhes = {"Detalhes": {"Erro": "Timeout ao carregar os detalhes."}}
+        except Exception as e:
+            METRICS.incr('details_failed')
+            logging.error(f"Unexpected error for {product.nome}: {e}", exc_info=True)
+            product.detalhes = {"Detalhes": {"Erro": f"Ocorreu um erro inesperado: {str(e)}"}}
 
-                # --- Retry específico para HTTP 429 ---
-                html = self._retry_if_429(max_retries=2)
+    def __enter__(self):
+        return self
 
-                product.detalhes = self.collectors.get_product_details(html)
-                logging.info(f"Details fetched successfully for {product.nome}.")
-            except TimeoutException as e:
-                logging.error(f"Timeout while getting details for {product.nome}: {e}")
-                product.detalhes = {"Detalhes": {"Erro": "Timeout ao carregar os detalhes."}}
-            except Exception as e:
-                logging.error(f"Unexpected error for {product.nome}: {e}", exc_info=True)
-                product.detalhes = {"Detalhes": {"Erro": f"Ocorreu um erro inesperado: {str(e)}"}}
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def close(self):
-        logging.info("Closing the WebDriver.")
-        self.driver.quit()
\ No newline at end of file
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self._owns_wait_stats:
+            self.wait_stats.log_summary()
+        if self._owns_rate_limiter:
+            m = self.rate_limiter.metrics()
+            METRICS.set_gauge('rate_limiter.rate', m['rate'])
+            METRICS.set_gauge('rate_limiter.requests', m['requests'])
+            METRICS.set_gauge('rate_limiter.throttled_429', m['throttled_429'])
+            METRICS.set_gauge('rate_limiter.waited_seconds', m['waited_seconds'])
+            logging.info(f"Rate limiter: {m['requests']} requests, {m['throttled_429']} x 429, "
+                         f"final rate {m['rate']:.2f} req/s, {m['waited_seconds']:.1f}s waited.")
+        if self._driver is not None:
+            logging.info("Closing the WebDriver.")
+            self._driver.quit()
+            self._driver = None
\ No newline at end of file
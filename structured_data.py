@@ -0,0 +1,149 @@
+# structured_data.py
+"""Leitura de dados estruturados embutidos na página (JSON-LD e JSON de hidratação)."""
+import re
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # dependência opcional: json da stdlib como fallback
+    _loads = json.loads
+
+_JSON_LD_RE = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+_HYDRATION_RE = re.compile(
+    r'<script[^>]*id=["\'](?:__NEXT_DATA__|__NUXT_DATA__|__APOLLO_STATE__)["\'][^>]*>(.*?)</script>', re.S | re.I
+)
+
+# um registro de produto: (nome, preço, link, avaliação)
+ProductRecord = Tuple[str, float, str, float]
+
+
+def _parse_blocks(regex: re.Pattern, html: str) -> List[Any]:
+    blocks = []
+    for raw in regex.findall(html):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            blocks.append(_loads(raw))
+        except ValueError as e:
+            logging.debug(f"Invalid embedded JSON block: {e}")
+    return blocks
+
+
+def _iter_dicts(obj: Any) -> Iterator[Dict[str, Any]]:
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            yield cur
+            stack.extend(reversed(list(cur.values())))
+        elif isinstance(cur, list):
+            stack.extend(reversed(cur))
+
+
+def _types(node: Dict[str, Any]) -> List[str]:
+    t = node.get('@type')
+    return [t] if isinstance(t, str) else list(t or [])
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        text = value.replace('R$', '').strip()
+        if ',' in text:
+            # formato brasileiro: 1.234,56
+            text = text.replace('.', '').replace(',', '.')
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return None
+
+
+def _offer_price(offers: Any) -> Optional[float]:
+    if isinstance(offers, list):
+        prices = [p for p in (_offer_price(o) for o in offers) if p is not None]
+        return min(prices) if prices else None
+    if isinstance(offers, dict):
+        for key in ('price', 'lowPrice'):
+            price = _to_float(offers.get(key))
+            if price is not None:
+                return price
+    return None
+
+
+def _product_record(node: Dict[str, Any]) -> Optional[ProductRecord]:
+    name = node.get('name')
+    link = node.get('url') or node.get('link') or node.get('href')
+    price = _offer_price(node.get('offers'))
+    if price is None:
+        price = _to_float(node.get('price') or node.get('lowPrice') or node.get('bestPrice'))
+    if not (isinstance(name, str) and name.strip() and isinstance(link, str) and price is not None):
+        return None
+    rating = 0.0
+    aggregate = node.get('aggregateRating')
+    if isinstance(aggregate, dict):
+        rating = _to_float(aggregate.get('ratingValue')) or 0.0
+    else:
+        rating = _to_float(node.get('rating')) or 0.0
+    return name.strip(), price, link, rating
+
+
+def _json_ld_products(blocks: List[Any]) -> List[ProductRecord]:
+    records = []
+    for node in (d for block in blocks for d in _iter_dicts(block)):
+        if 'Product' in _types(node):
+            record = _product_record(node)
+            if record:
+                records.append(record)
+    return records
+
+
+def _hydration_products(blocks: List[Any]) -> List[ProductRecord]:
+    # sem schema conhecido: qualquer objeto com nome + preço + link é candidato
+    records = []
+    for node in (d for block in blocks for d in _iter_dicts(block)):
+        if 'name' in node and ('url' in node or 'link' in node or 'href' in node):
+            record = _product_record(node)
+            if record:
+                records.append(record)
+    return records
+
+
+def extract_search_products(html: str) -> Tuple[Optional[str], List[ProductRecord]]:
+    """Produtos da página de busca a partir do JSON embutido; retorna (caminho, registros).
+
+    O caminho é 'json-ld' ou 'hydration'; (None, []) quando não há nada aproveitável.
+    """
+    records = _json_ld_products(_parse_blocks(_JSON_LD_RE, html))
+    if records:
+        return 'json-ld', records
+    records = _hydration_products(_parse_blocks(_HYDRATION_RE, html))
+    if records:
+        return 'hydration', records
+    return None, []
+
+
+def extract_product_specs(html: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Ficha técnica a partir de Product.additionalProperty (PropertyValue) no JSON-LD."""
+    for node in (d for block in _parse_blocks(_JSON_LD_RE, html) for d in _iter_dicts(block)):
+        if 'Product' not in _types(node):
+            continue
+        props = node.get('additionalProperty')
+        if not isinstance(props, list):
+            continue
+        group = {}
+        for prop in props:
+            if isinstance(prop, dict):
+                key, val = prop.get('name'), prop.get('value')
+                if isinstance(key, str) and key.strip() and val not in (None, ''):
+                    group[key.strip()] = str(val).strip()
+        if group:
+            return {'Ficha técnica': group}
+    return None
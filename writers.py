@@ -0,0 +1,168 @@
+# writers.py
+"""Gravação incremental dos resultados (JSONL ou Parquet) com ficha técnica em formato longo.
+
+Dois conjuntos de dados, ambos "longos" (sem colunas dinâmicas):
+  - products: uma linha por produto visto numa página de busca (query, filtro, página);
+  - specs: uma linha por (produto, grupo, chave, valor) da ficha técnica.
+"""
+import os
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from produto import Produto
+from config import OUTPUT_DIR, OUTPUT_FORMAT, PARQUET_BATCH_ROWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dependência opcional: só necessária para OUTPUT_FORMAT = 'parquet'
+    pa = pq = None
+
+# tipos fixos por conjunto: inferidos a cada parte, uma coluna toda None viraria `null` e as
+# partes deixariam de ser lidas juntas
+PARQUET_SCHEMAS = {
+    'products': pa.schema([
+        ('run_id', pa.string()), ('observed_at', pa.string()), ('query', pa.string()),
+        ('filtro', pa.string()), ('pagina', pa.int64()), ('nome', pa.string()),
+        ('preco', pa.float64()), ('avaliacao', pa.float64()), ('link', pa.string()),
+    ]),
+    'specs': pa.schema([
+        ('run_id', pa.string()), ('link', pa.string()), ('nome', pa.string()),
+        ('grupo', pa.string()), ('chave', pa.string()), ('valor', pa.string()),
+    ]),
+} if pa is not None else {}
+
+
+def spec_rows(produto: Produto) -> List[Dict[str, Optional[str]]]:
+    """Ficha técnica do produto como linhas (grupo, chave, valor)."""
+    rows = []
+    for group, sub_details in produto.detalhes.items():
+        if isinstance(sub_details, dict):
+            for key, value in sub_details.items():
+                rows.append({'grupo': group, 'chave': key, 'valor': str(value)})
+        else:
+            rows.append({'grupo': group, 'chave': None, 'valor': str(sub_details)})
+    return rows
+
+
+class ResultWriter:
+    """Base: monta as linhas normalizadas; subclasses decidem como persisti-las."""
+
+    def __init__(self, output_dir: str = OUTPUT_DIR, run_id: Optional[str] = None):
+        self.output_dir = output_dir
+        self.run_id = run_id or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '-' + uuid.uuid4().hex[:6]
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write_products(self, products: List[Produto], query: str, filtro: str, page: int):
+        observed_at = datetime.now(timezone.utc).isoformat()
+        rows = [{
+            'run_id': self.run_id,
+            'observed_at': observed_at,
+            'query': query,
+            'filtro': filtro,
+            'pagina': page,
+            'nome': p.nome,
+            'preco': p.preco,
+            'avaliacao': p.avaliacao,
+            'link': p.link,
+        } for p in products]
+        if rows:
+            with self._lock:
+                self._emit('products', rows)
+
+    def write_details(self, produto: Produto):
+        rows = [{'run_id': self.run_id, 'link': produto.link, 'nome': produto.nome, **row}
+                for row in spec_rows(produto)]
+        if rows:
+            with self._lock:
+                self._emit('specs', rows)
+
+    def _emit(self, dataset: str, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlResultWriter(ResultWriter):
+    """Uma linha JSON por registro, com flush a cada lote: um crash perde no máximo o lote atual."""
+
+    def __init__(self, output_dir: str = OUTPUT_DIR, run_id: Optional[str] = None):
+        super().__init__(output_dir, run_id)
+        self._files = {}
+
+    def _emit(self, dataset: str, rows: List[Dict[str, Any]]):
+        f = self._files.get(dataset)
+        if f is None:
+            f = self._files[dataset] = open(os.path.join(self.output_dir, f"{dataset}.jsonl"), 'a', encoding='utf-8')
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+        f.flush()
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+
+class ParquetResultWriter(ResultWriter):
+    """Grava arquivos Parquet em partes (dataset/part-<run>-<n>.parquet) a cada `batch_rows` linhas.
+
+    Cada parte é um arquivo completo, então um crash só perde as linhas ainda em memória.
+    """
+
+    def __init__(self, output_dir: str = OUTPUT_DIR, run_id: Optional[str] = None,
+                 batch_rows: int = PARQUET_BATCH_ROWS):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output (pip install pyarrow).")
+        super().__init__(output_dir, run_id)
+        self.batch_rows = batch_rows
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._parts: Dict[str, int] = {}
+
+    def _emit(self, dataset: str, rows: List[Dict[str, Any]]):
+        buffer = self._buffers.setdefault(dataset, [])
+        buffer.extend(rows)
+        if len(buffer) >= self.batch_rows:
+            self._flush(dataset)
+
+    def _flush(self, dataset: str):
+        buffer = self._buffers.get(dataset)
+        if not buffer:
+            return
+        part = self._parts.get(dataset, 0)
+        directory = os.path.join(self.output_dir, dataset)
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pylist(buffer, schema=PARQUET_SCHEMAS.get(dataset))
+        pq.write_table(table, os.path.join(directory, f"part-{self.run_id}-{part:05d}.parquet"))
+        self._parts[dataset] = part + 1
+        self._buffers[dataset] = []
+
+    def close(self):
+        with self._lock:
+            for dataset in list(self._buffers):
+                self._flush(dataset)
+
+
+def open_writer(fmt: str = OUTPUT_FORMAT, output_dir: str = OUTPUT_DIR) -> Optional[ResultWriter]:
+    """Writer para o formato pedido ('jsonl', 'parquet' ou 'none')."""
+    if fmt == 'jsonl':
+        return JsonlResultWriter(output_dir)
+    if fmt == 'parquet':
+        return ParquetResultWriter(output_dir)
+    if fmt != 'none':
+        logging.warning(f"Unknown output format '{fmt}'. Streaming output disabled.")
+    return None